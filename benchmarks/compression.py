@@ -0,0 +1,96 @@
+"""
+Compare compression methods of cached pages.
+
+Load pages from the SQLite cache, compress them with every available method,
+and report the compression ratio and the cost of decompressing one page, which
+is what we pay on every cache hit.
+
+    python -m benchmarks.compression
+    python -m benchmarks.compression --save-dictionary .cache/pages.zstd-dict
+"""
+import argparse
+import pathlib
+import sqlite3
+import time
+from typing import List, Optional
+
+from linguee_api.config import settings
+from linguee_api.downloaders.page_codec import (
+    PageCodec,
+    train_zstd_dictionary,
+    zstandard,
+)
+
+
+def load_pages(cache_database: pathlib.Path, limit: Optional[int]) -> List[str]:
+    codec = PageCodec()
+    with sqlite3.connect(cache_database) as db:
+        query = "SELECT page FROM cache"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        return [codec.decode(row[0]) for row in db.execute(query)]
+
+
+def measure(name: str, codec: PageCodec, pages: List[str]) -> None:
+    raw_size = sum(len(page.encode("utf-8")) for page in pages)
+
+    started = time.perf_counter()
+    encoded = [codec.encode(page) for page in pages]
+    encode_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for data in encoded:
+        codec.decode(data)
+    decode_time = time.perf_counter() - started
+
+    encoded_size = sum(len(data) for data in encoded)
+    print(
+        f"{name:<20} "
+        f"{raw_size / encoded_size:>6.2f}x "
+        f"{encoded_size / 1024:>10.0f} KiB "
+        f"{encode_time / len(pages) * 1e6:>10.0f} us "
+        f"{decode_time / len(pages) * 1e6:>10.0f} us"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cache-database", type=pathlib.Path)
+    parser.add_argument("--limit", type=int, help="Only use first N pages")
+    parser.add_argument(
+        "--save-dictionary",
+        type=pathlib.Path,
+        help="Save the trained zstd dictionary to the file",
+    )
+    args = parser.parse_args()
+
+    pages = load_pages(args.cache_database or settings.cache_database, args.limit)
+    if not pages:
+        raise SystemExit("The cache is empty. Nothing to measure.")
+    raw_size = sum(len(page.encode("utf-8")) for page in pages)
+    print(f"{len(pages)} pages, {raw_size / 1024:.0f} KiB\n")
+    print(f"{'method':<20} {'ratio':>7} {'size':>14} {'encode':>13} {'decode':>13}")
+
+    measure("none", PageCodec("none"), pages)
+    for level in (1, 6, 9):
+        measure(f"zlib level={level}", PageCodec("zlib", level=level), pages)
+    if zstandard is None:
+        print("\nzstandard is not installed, skipping zstd")
+        return
+
+    for level in (3, 9, 19):
+        measure(f"zstd level={level}", PageCodec("zstd", level=level), pages)
+
+    # Train on every other page, so that the test set differs from the sample.
+    dictionary = train_zstd_dictionary(pages[::2])
+    for level in (3, 9, 19):
+        codec = PageCodec("zstd", level=level, zstd_dictionary=dictionary)
+        measure(f"zstd+dict level={level}", codec, pages[1::2])
+
+    if args.save_dictionary:
+        args.save_dictionary.write_bytes(train_zstd_dictionary(pages))
+        print(f"\nDictionary saved to {args.save_dictionary}")
+
+
+if __name__ == "__main__":
+    main()
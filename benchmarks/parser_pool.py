@@ -0,0 +1,101 @@
+"""
+Measure parsing throughput under concurrent load.
+
+Parse search result pages from the SQLite cache with many concurrent tasks, in
+the event loop and in the parser pool, and report pages per second and the
+worst event loop stall, as seen by a task that should wake up every millisecond,
+like a request served from the memory cache.
+
+    python -m benchmarks.parser_pool --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import pathlib
+import time
+from typing import List, Optional
+
+from benchmarks.parsing import load_search_pages
+from linguee_api.config import settings
+from linguee_api.models import FollowCorrections
+from linguee_api.parser_pool import ParserPool
+from linguee_api.parsers import XExtractParser
+
+
+async def measure(
+    name: str, pool: ParserPool, pages: List[str], concurrency: int
+) -> None:
+    await pool.open()
+    # Start the workers before measuring
+    await asyncio.gather(
+        *[
+            pool.parse_search_result(page, FollowCorrections.ALWAYS)
+            for page in pages[: pool.max_workers]
+        ]
+    )
+    queue: "asyncio.Queue[str]" = asyncio.Queue()
+    for page in pages:
+        queue.put_nowait(page)
+
+    async def worker() -> None:
+        while not queue.empty():
+            page = queue.get_nowait()
+            await pool.parse_search_result(page, FollowCorrections.ALWAYS)
+            # Yield to other tasks, as a request handler does on I/O
+            await asyncio.sleep(0)
+
+    max_stall = 0.0
+
+    async def ticker() -> None:
+        nonlocal max_stall
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            max_stall = max(max_stall, time.perf_counter() - started - 0.001)
+
+    ticker_task = asyncio.ensure_future(ticker())
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    # Let the ticker see the last stall
+    await asyncio.sleep(0.002)
+    ticker_task.cancel()
+    await pool.close()
+    print(
+        f"{name:<24} {len(pages) / elapsed:>8.0f} pages/s, "
+        f"max event loop stall {max_stall * 1000:.1f} ms"
+    )
+
+
+async def run(pages: List[str], concurrency: int, workers: Optional[int]) -> None:
+    parser = XExtractParser()
+    # A threshold above any page size parses everything in the event loop
+    inline = ParserPool(parser, inline_threshold=2**62)
+    await measure("event loop", inline, pages, concurrency)
+    pool = ParserPool(parser, max_workers=workers, inline_threshold=0)
+    await measure(f"pool of {pool.max_workers} processes", pool, pages, concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cache-database", type=pathlib.Path)
+    parser.add_argument("--limit", type=int, help="Only use first N pages")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="Parse every page N times"
+    )
+    args = parser.parse_args()
+
+    pages = load_search_pages(
+        args.cache_database or settings.cache_database, args.limit
+    )
+    if not pages:
+        raise SystemExit("The cache has no search result pages. Nothing to measure.")
+    pages *= args.repeat
+    print(f"{len(pages)} pages, {args.concurrency} concurrent tasks\n")
+    asyncio.run(run(pages, args.concurrency, args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+Benchmark the page parsers.
+
+Load every page from the SQLite cache, the corpus of the tests, and parse it with
+every parser. Time each phase of parsing separately: classifying the page,
+building the document, evaluating the schema and constructing the models, and
+the whole parse. For every phase, report the throughput and the percentiles of
+the time per page, and for the whole parse, the peak memory.
+
+Save the results as a baseline, and compare later runs with it. The run fails if
+the median time of any phase grew by more than the threshold.
+
+    python -m benchmarks.parsing --save-baseline parsing-baseline.json
+    python -m benchmarks.parsing --baseline parsing-baseline.json --threshold 0.1
+"""
+import argparse
+import gc
+import json
+import math
+import pathlib
+import sqlite3
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from linguee_api.config import settings
+from linguee_api.factory import make_page_codec
+from linguee_api.lxml_parser import LxmlParser
+from linguee_api.models import (
+    Autocompletions,
+    FollowCorrections,
+    SearchResult,
+    construct_trusted,
+)
+from linguee_api.parser_utils import parse_tree
+from linguee_api.parsers import IParser, XExtractParser, classify_page, parse_document
+
+
+class ParserUnderTest(NamedTuple):
+    parser: IParser
+    # Parse the page into the document, accepted by the *_to_dict() methods
+    build_document: Callable[[str], Any]
+    search_result_to_dict: Callable[[Any], dict]
+    autocompletions_to_dict: Callable[[Any], dict]
+
+
+def get_xextract_parser() -> ParserUnderTest:
+    parser = XExtractParser()
+    return ParserUnderTest(
+        parser,
+        parse_document,
+        parser.parse_search_result_to_dict,
+        parser.parse_autocompletions_to_dict,
+    )
+
+
+def get_lxml_parser() -> ParserUnderTest:
+    parser = LxmlParser()
+    return ParserUnderTest(
+        parser,
+        parse_tree,
+        parser.parse_search_result_to_dict,
+        parser.parse_autocompletions_to_dict,
+    )
+
+
+PARSERS: Dict[str, Callable[[], ParserUnderTest]] = {
+    "xextract": get_xextract_parser,
+    "lxml": get_lxml_parser,
+}
+
+Stats = Dict[str, float]
+
+
+class Corpus(NamedTuple):
+    search_pages: List[str]
+    autocompletions_pages: List[str]
+
+
+def load_corpus(cache_database: pathlib.Path, limit: Optional[int]) -> Corpus:
+    codec = make_page_codec(settings)
+    corpus = Corpus(search_pages=[], autocompletions_pages=[])
+    with sqlite3.connect(cache_database) as db:
+        query = "SELECT url, page FROM cache ORDER BY url"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        for url, page in db.execute(query):
+            if "qe=" in url:
+                corpus.autocompletions_pages.append(codec.decode(page))
+            elif "query=" in url:
+                corpus.search_pages.append(codec.decode(page))
+    return corpus
+
+
+def load_search_pages(cache_database: pathlib.Path, limit: Optional[int]) -> List[str]:
+    return load_corpus(cache_database, limit).search_pages
+
+
+def time_phase(func: Callable[[Any], Any], inputs: Sequence, repeat: int) -> List[int]:
+    """Return the best time of every input in nanoseconds, after a warm-up run."""
+    for item in inputs:
+        func(item)
+    best = [math.inf] * len(inputs)
+    gc.collect()
+    for _ in range(repeat):
+        for i, item in enumerate(inputs):
+            started = time.perf_counter_ns()
+            func(item)
+            best[i] = min(best[i], time.perf_counter_ns() - started)
+    return [int(value) for value in best]
+
+
+def percentile(sorted_values: List[int], p: float) -> int:
+    """Nearest-rank percentile."""
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def get_stats(times: List[int]) -> Stats:
+    sorted_times = sorted(times)
+    total = sum(sorted_times)
+    return {
+        "pages": len(times),
+        "pages_per_second": len(times) / total * 1e9 if total else 0.0,
+        "mean_us": total / len(times) / 1e3,
+        "p50_us": percentile(sorted_times, 50) / 1e3,
+        "p90_us": percentile(sorted_times, 90) / 1e3,
+        "p99_us": percentile(sorted_times, 99) / 1e3,
+        "max_us": sorted_times[-1] / 1e3,
+    }
+
+
+def get_peak_memory(func: Callable[[Any], Any], inputs: Sequence) -> float:
+    """Return the peak memory allocated while processing the inputs, in KiB."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        for item in inputs:
+            func(item)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def is_parsed(func: Callable[[Any], Any], item: Any) -> bool:
+    """Return True if the function doesn't raise errors on the input."""
+    try:
+        func(item)
+    except Exception:
+        return False
+    return True
+
+
+def benchmark_parser(
+    under_test: ParserUnderTest, corpus: Corpus, repeat: int
+) -> Dict[str, Stats]:
+    parser = under_test.parser
+    results: Dict[str, Stats] = {}
+
+    def run(name: str, func: Callable[[Any], Any], inputs: Sequence) -> None:
+        if inputs:
+            results[name] = get_stats(time_phase(func, inputs, repeat))
+
+    def run_total(name: str, func: Callable[[Any], Any], inputs: Sequence) -> None:
+        run(name, func, inputs)
+        if inputs:
+            results[name]["peak_memory_kib"] = get_peak_memory(func, inputs)
+
+    # Search results. Correction and not found pages stop after classification,
+    # so only result pages go through the schema and the models.
+    def parse_search_result(page: str) -> Any:
+        return parser.parse_search_result(page, FollowCorrections.ALWAYS)
+
+    pages = corpus.search_pages
+    result_pages = [
+        page for page in pages if isinstance(parse_search_result(page), SearchResult)
+    ]
+    documents = [under_test.build_document(page) for page in result_pages]
+    run("search: classify", classify_search_result_page, pages)
+    run("search: document", under_test.build_document, result_pages)
+    run("search: schema", under_test.search_result_to_dict, documents)
+    dicts = [under_test.search_result_to_dict(document) for document in documents]
+    run("search: model", lambda data: SearchResult(**data), dicts)
+    run_total("search: total", parse_search_result, pages)
+
+    # Autocompletions. Skip pages that fail to parse.
+    pages = [
+        page
+        for page in corpus.autocompletions_pages
+        if is_parsed(parser.parse_autocompletions, page)
+    ]
+    documents = [under_test.build_document(page) for page in pages]
+    run("autocompletions: document", under_test.build_document, pages)
+    run("autocompletions: schema", under_test.autocompletions_to_dict, documents)
+    dicts = [under_test.autocompletions_to_dict(document) for document in documents]
+    # Parsers create autocompletion models without validation
+    run(
+        "autocompletions: model",
+        lambda data: construct_trusted(Autocompletions, data),
+        dicts,
+    )
+    run_total("autocompletions: total", parser.parse_autocompletions, pages)
+    return results
+
+
+def classify_search_result_page(page: str) -> Any:
+    return classify_page(page, find_correction=True, stop_at_correction=True)
+
+
+def print_results(results: Dict[str, Dict[str, Stats]]) -> None:
+    print(
+        f"{'parser':<10} {'phase':<26} {'pages':>6} {'pages/s':>9} {'mean':>8} "
+        f"{'p50':>8} {'p90':>8} {'p99':>8} {'max':>8} {'peak mem':>10}"
+    )
+    for parser_name, phases in results.items():
+        for phase, stats in phases.items():
+            peak_memory = stats.get("peak_memory_kib")
+            line = (
+                f"{parser_name:<10} {phase:<26} {stats['pages']:>6.0f} "
+                f"{stats['pages_per_second']:>9.0f} "
+                f"{stats['mean_us']:>6.0f}us {stats['p50_us']:>6.0f}us "
+                f"{stats['p90_us']:>6.0f}us {stats['p99_us']:>6.0f}us "
+                f"{stats['max_us']:>6.0f}us"
+            )
+            if peak_memory is not None:
+                line += f" {peak_memory:>6.0f} KiB"
+            print(line)
+
+
+def compare_with_baseline(
+    results: Dict[str, Dict[str, Stats]],
+    baseline: Dict[str, Dict[str, Stats]],
+    threshold: float,
+) -> List[str]:
+    """Print the change of median times. Return the regressed phases."""
+    regressions = []
+    print(f"\nMedian time compared with the baseline, threshold +{threshold:.0%}")
+    for parser_name, phases in results.items():
+        for phase, stats in phases.items():
+            baseline_stats = baseline.get(parser_name, {}).get(phase)
+            if not baseline_stats or not baseline_stats["p50_us"]:
+                continue
+            change = stats["p50_us"] / baseline_stats["p50_us"] - 1
+            regressed = change > threshold
+            print(
+                f"{parser_name:<10} {phase:<26} {change:>+8.1%}"
+                + ("  REGRESSION" if regressed else "")
+            )
+            if regressed:
+                regressions.append(f"{parser_name} {phase}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cache-database", type=pathlib.Path)
+    parser.add_argument("--limit", type=int, help="Only use first N pages")
+    parser.add_argument(
+        "--parser",
+        action="append",
+        choices=list(PARSERS),
+        help="Parser to benchmark, all by default. Can be repeated.",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Take the best of N runs of every page"
+    )
+    parser.add_argument(
+        "--save-baseline", type=pathlib.Path, help="Save the results to the file"
+    )
+    parser.add_argument(
+        "--baseline", type=pathlib.Path, help="Compare the results with the file"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Allowed growth of median times, compared with the baseline",
+    )
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.cache_database or settings.cache_database, args.limit)
+    if not corpus.search_pages and not corpus.autocompletions_pages:
+        raise SystemExit("The cache is empty. Nothing to measure.")
+    print(
+        f"{len(corpus.search_pages)} search result pages, "
+        f"{len(corpus.autocompletions_pages)} autocompletion pages\n"
+    )
+
+    results = {
+        name: benchmark_parser(PARSERS[name](), corpus, args.repeat)
+        for name in args.parser or PARSERS
+    }
+    print_results(results)
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nBaseline saved to {args.save_baseline}")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        if regressions:
+            raise SystemExit(f"\nSlower than the baseline: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 import sentry_sdk
-from fastapi import FastAPI, Query, Response, status
+from fastapi import FastAPI, HTTPException, Query, Response, status
 from sentry_sdk.integrations.asgi import SentryAsgiMiddleware
-from starlette.responses import RedirectResponse
+from starlette.responses import JSONResponse, RedirectResponse
 
 from linguee_api.config import settings
 from linguee_api.const import (
@@ -9,17 +9,15 @@ from linguee_api.const import (
     LANGUAGE_CODE,
     PROJECT_DESCRIPTION,
 )
-from linguee_api.downloaders.httpx_downloader import HTTPXDownloader
-from linguee_api.downloaders.memory_cache import MemoryCache
-from linguee_api.downloaders.sqlite_cache import SQLiteCache
-from linguee_api.linguee_client import LingueeClient
+from linguee_api.factory import make_client
 from linguee_api.models import (
     Autocompletions,
     FollowCorrections,
     ParseError,
     SearchResult,
+    SearchResultSection,
 )
-from linguee_api.parsers import XExtractParser
+from linguee_api.parse_profiler import parse_profiler
 
 sentry_sdk.init(dsn=settings.sentry_dsn, environment=settings.sentry_environment)
 app = FastAPI(
@@ -29,13 +27,19 @@ app = FastAPI(
 )
 app.add_middleware(SentryAsgiMiddleware)
 
-page_downloader = MemoryCache(
-    upstream=SQLiteCache(
-        cache_database=settings.cache_database,
-        upstream=HTTPXDownloader(),
-    )
-)
-client = LingueeClient(page_downloader=page_downloader, page_parser=XExtractParser())
+client = make_client(settings)
+
+
+@app.on_event("startup")
+async def open_client():
+    await client.open()
+
+
+@app.on_event("shutdown")
+async def close_client():
+    await client.close()
+    if parse_profiler.enabled and settings.parse_profiling_dump_file:
+        parse_profiler.dump(settings.parse_profiling_dump_file)
 
 
 @app.get("/", include_in_schema=False)
@@ -43,6 +47,17 @@ def index():
     return RedirectResponse("/docs")
 
 
+@app.get("/debug/parse_profile", include_in_schema=False)
+def parse_profile(reset: bool = False):
+    """Return the parse profiling stats by field, the slowest first."""
+    if not parse_profiler.enabled:
+        raise HTTPException(status.HTTP_404_NOT_FOUND)
+    stats = parse_profiler.get_stats()
+    if reset:
+        parse_profiler.reset()
+    return stats
+
+
 @app.get(
     "/api/v2/translations",
     status_code=status.HTTP_200_OK,
@@ -75,6 +90,7 @@ async def translations(
         dst=dst,
         guess_direction=guess_direction,
         follow_corrections=follow_corrections,
+        sections={SearchResultSection.LEMMAS},
     )
     if isinstance(result, ParseError):
         response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -108,6 +124,7 @@ async def examples(
         dst=dst,
         guess_direction=guess_direction,
         follow_corrections=follow_corrections,
+        sections={SearchResultSection.EXAMPLES},
     )
     if isinstance(result, ParseError):
         response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -141,6 +158,7 @@ async def external_sources(
         dst=dst,
         guess_direction=guess_direction,
         follow_corrections=follow_corrections,
+        sections={SearchResultSection.EXTERNAL_SOURCES},
     )
     if isinstance(result, ParseError):
         response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -171,4 +189,6 @@ async def autocompletions(
     if isinstance(result, ParseError):
         response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
         return result
-    return result.autocompletions
+    # The models only have plain fields, so the dict is ready for JSON, and the
+    # generic FastAPI encoder, slow on many tiny responses, can be skipped.
+    return JSONResponse(result.dict()["autocompletions"])
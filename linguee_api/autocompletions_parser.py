@@ -0,0 +1,120 @@
+"""
+Fast path for autocompletion pages.
+
+Autocompletions are requested on every keystroke, and their pages are tiny, so
+the fixed costs of parsing dominate: a dozen XPath expressions evaluated per
+item, and the validation of the models. Here, the subtree of every item is
+walked once, and the CSS selectors of autocompletions_schema are checked by
+hand, with the same semantics: class names are matched as whitespace-separated
+tokens, and elements are returned in the document order. The models are created
+without validation, since the parser output is trusted.
+
+Both parsers use this fast path. The results are the same as of
+autocompletions_schema, checked by tests against all pages in the cache.
+"""
+import re
+from typing import List, Optional, Sequence
+
+from lxml import etree
+from xextract.parsers import ParsingError
+
+from linguee_api.models import Autocompletions, construct_trusted
+from linguee_api.parser_utils import (
+    concat_texts,
+    get_element_text,
+    normalize,
+    parse_tree,
+    require_root,
+)
+
+# Whitespace, as defined by XPath normalize-space()
+_XPATH_WHITESPACE = re.compile(r"[ \t\r\n]+")
+
+
+def parse_autocompletions(page_html: str) -> Autocompletions:
+    parsed_result = parse_autocompletions_to_dict(parse_tree(page_html))
+    return construct_trusted(Autocompletions, parsed_result)
+
+
+def parse_autocompletions_to_dict(root: Optional[etree._Element]) -> dict:
+    root = require_root(root)
+    return {
+        "autocompletions": [
+            parse_autocompletion(node)
+            for node in root.iter("div")
+            if "autocompletion_item" in get_classes(node)
+        ]
+    }
+
+
+def parse_autocompletion(item: etree._Element) -> dict:
+    texts: List[etree._Element] = []
+    pos: List[etree._Element] = []
+    translations: List[etree._Element] = []
+    for node in item.iter("div"):
+        classes = get_classes(node)
+        if not classes or node is item:
+            continue
+        # div.main_row > div.main_item, div.main_row > div.main_wordtype
+        if "main_item" in classes or "main_wordtype" in classes:
+            if has_parent(node, "main_row"):
+                if "main_item" in classes:
+                    texts.append(node)
+                if "main_wordtype" in classes:
+                    pos.append(node)
+        if "translation_item" in classes and is_translation(node, item):
+            translations.append(node)
+
+    if len(texts) != 1:
+        raise ParsingError(f'"text" matched {len(texts)} elements ("1" expected).')
+    if not translations:
+        raise ParsingError('"translations" matched 0 elements ("+" expected).')
+    return {
+        "text": normalize(get_element_text(texts[0])),
+        "pos": concat_texts([get_element_text(node) for node in pos]),
+        "translations": [
+            parse_autocompletion_translation(node) for node in translations
+        ],
+    }
+
+
+def parse_autocompletion_translation(translation: etree._Element) -> dict:
+    # div.translation_item > div.wordtype
+    pos = [
+        node
+        for node in translation.iter("div")
+        if node is not translation
+        and "wordtype" in get_classes(node)
+        and has_parent(node, "translation_item")
+    ]
+    return {
+        "text": normalize(get_element_text(translation)),
+        "pos": concat_texts([get_element_text(node) for node in pos]),
+    }
+
+
+def is_translation(node: etree._Element, item: etree._Element) -> bool:
+    """Same as "div.translation_row > div > div.translation_item" within the item."""
+    parent = node.getparent()
+    return (
+        parent is not item
+        and parent.tag == "div"
+        and has_parent(parent, "translation_row")
+    )
+
+
+def has_parent(node: etree._Element, class_name: str) -> bool:
+    """Same as the "div.class_name > " part of a CSS selector."""
+    parent = node.getparent()
+    return parent.tag == "div" and class_name in get_classes(parent)
+
+
+def get_classes(node: etree._Element) -> Sequence[str]:
+    """Return the class names of the element, as CSS selectors match them."""
+    classes = node.get("class")
+    if not classes:
+        return ()
+    if classes.isidentifier():
+        # A single class name, the most common case
+        return (classes,)
+    return _XPATH_WHITESPACE.split(classes)
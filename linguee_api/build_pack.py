@@ -0,0 +1,49 @@
+"""
+Build a cache pack from the SQLite cache.
+
+Export all pages from the SQLite cache into a read-only pack file, which can be
+shipped to other nodes and used with the CACHE_PACK_FILE setting. Pages are
+copied as they are stored, so the pack must be read with the same compression
+settings (and zstd dictionary) as the SQLite cache.
+
+    python -m linguee_api.build_pack .cache/pages.pack
+"""
+import argparse
+import pathlib
+import sqlite3
+from typing import Iterator, Tuple
+
+from loguru import logger
+
+from linguee_api.config import settings
+from linguee_api.downloaders.pack_cache import write_pack
+from linguee_api.downloaders.page_codec import PageCodec
+from linguee_api.factory import make_page_codec
+
+
+def read_sqlite_pages(
+    cache_database: pathlib.Path, codec: PageCodec
+) -> Iterator[Tuple[str, bytes]]:
+    """Yield URLs and encoded pages from the SQLite cache."""
+    with sqlite3.connect(cache_database) as db:
+        for url, page in db.execute("SELECT url, page FROM cache ORDER BY url"):
+            # Pages stored before compression was enabled are text.
+            yield url, codec.encode(page) if isinstance(page, str) else page
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pack_file", type=pathlib.Path, help="Pack file to write")
+    parser.add_argument("--cache-database", type=pathlib.Path)
+    args = parser.parse_args()
+
+    cache_database = args.cache_database or settings.cache_database
+    if not cache_database.exists():
+        raise SystemExit(f"{cache_database} doesn't exist")
+    pages = read_sqlite_pages(cache_database, make_page_codec(settings))
+    count = write_pack(args.pack_file, pages)
+    logger.info(f"Wrote {count} pages to {args.pack_file}")
+
+
+if __name__ == "__main__":
+    main()
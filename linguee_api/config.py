@@ -1,9 +1,9 @@
 import pathlib
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseSettings
 
-from linguee_api.const import PROJECT_ROOT
+from linguee_api.const import COMPRESSION_METHOD, PROJECT_ROOT
 
 
 class Settings(BaseSettings):
@@ -15,12 +15,95 @@ class Settings(BaseSettings):
 
     # File and SQLite cache settings
     cache_directory: pathlib.Path = PROJECT_ROOT / ".cache"
+    cache_compression: COMPRESSION_METHOD = "zlib"
+    cache_compression_level: Optional[int] = None
+    cache_zstd_dictionary: Optional[pathlib.Path] = None
+    cache_max_age: Optional[int] = None
+    cache_max_size: Optional[int] = None
+    cache_cleanup_interval: float = 600.0
+    cache_soft_ttl: Optional[float] = None
+    cache_max_background_refreshes: int = 10
+    cache_pack_file: Optional[pathlib.Path] = None
+
+    # Redis cache settings
+    redis_url: Optional[str] = None
+    redis_key_prefix: str = "linguee:page:"
+    redis_max_connections: int = 20
+
+    # Memory cache settings
+    memory_cache_max_bytes: int = 64 * 1024 * 1024
+
+    # Result cache settings
+    result_cache: bool = True
+    result_cache_max_size: Optional[int] = None
+
+    # Negative cache settings
+    negative_cache: bool = True
+    negative_cache_not_found_ttl: float = 300.0
+    negative_cache_error_ttl: float = 10.0
+    negative_cache_max_size: int = 10000
+
+    # Page parser, as "module:class". Both parsers return the same results.
+    parser: str = "linguee_api.parsers:XExtractParser"
+
+    # Parser pool settings. Pages are parsed in worker processes when enabled.
+    parser_pool: bool = False
+    parser_pool_size: Optional[int] = None
+    parser_pool_inline_threshold: int = 16 * 1024
+
+    # Parse profiling settings. Stats are served on /debug/parse_profile.
+    parse_profiling: bool = False
+    parse_profiling_dump_file: Optional[pathlib.Path] = None
+
+    # SQLite cache settings
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size: int = 16 * 1024 * 1024
+    sqlite_write_behind: bool = False
+    sqlite_write_batch_size: int = 100
+    sqlite_write_flush_interval: float = 1.0
+    sqlite_write_queue_size: int = 1000
+
+    # Upstream HTTP client settings
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry: float = 30.0
+    http_connect_timeout: float = 5.0
+    http_read_timeout: float = 10.0
+    http_pool_timeout: float = 5.0
+    http2: bool = False
+
+    # Egress pool settings
+    egress_proxies: List[str] = []
+    egress_local_addresses: List[str] = []
+    egress_ejection_time: float = 300.0
+
+    # Upstream rate limiter settings. Requests per second, disabled when not set.
+    upstream_rate_limit: Optional[float] = None
+    upstream_burst: int = 10
+    upstream_max_delay: Optional[float] = 10.0
+
+    # Upstream retry settings
+    upstream_max_attempts: int = 3
+    upstream_retry_backoff: float = 0.1
+    upstream_retry_max_backoff: float = 2.0
+    upstream_deadline: float = 15.0
+    upstream_hedge: bool = False
+    upstream_hedge_delay: Optional[float] = None
+
+    # Circuit breaker settings
+    circuit_breaker_failure_threshold: int = 3
+    circuit_breaker_reset_timeout: float = 60.0
 
     @property
     def cache_database(self) -> pathlib.Path:
         """Cache database."""
         return self.cache_directory / "cache.sqlite3"
 
+    @property
+    def result_cache_database(self) -> pathlib.Path:
+        """Result cache database."""
+        return self.cache_directory / "results.sqlite3"
+
     class Config:
         env_file = (PROJECT_ROOT / ".env").as_posix()
 
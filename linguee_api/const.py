@@ -58,6 +58,7 @@ LANGUAGES = {
     "zh": "chinese",
 }
 MAX_REDIRECTS = 5
+COMPRESSION_METHOD = Literal["none", "zlib", "zstd"]
 PROJECT_DESCRIPTION = """
 <p>
     <a href="https://linguee.com" target="_blank">Linguee</a> provides excellent
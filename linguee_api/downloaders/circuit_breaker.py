@@ -0,0 +1,78 @@
+import time
+from typing import Optional
+
+from linguee_api.downloaders.interfaces import (
+    IDownloader,
+    IDownloaderWrapper,
+    UpstreamBlockedError,
+)
+
+ERROR_CIRCUIT_OPEN = (
+    "The Linguee server has been returning 503, so the API proxy stopped sending "
+    "requests to it for a while. Try again in {retry_after:.0f} seconds."
+)
+
+
+class CircuitBreakerDownloader(IDownloaderWrapper):
+    """
+    Circuit breaker.
+
+    After failure_threshold consecutive 503 responses, the circuit opens, and for
+    the next reset_timeout seconds all downloads fail right away with
+    UpstreamBlockedError, without going to the upstream. Then one probe request
+    is let through (the circuit is half-open), and the other requests keep
+    failing. If the probe succeeds, the circuit closes. Otherwise, it opens again
+    for another reset_timeout seconds.
+    """
+
+    def __init__(
+        self,
+        upstream: IDownloader,
+        *,
+        failure_threshold: int = 3,
+        reset_timeout: float = 60.0,
+    ):
+        self.upstream = upstream
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    async def download(self, url: str) -> str:
+        if self._opened_at is None:
+            return await self._download(url)
+
+        retry_after = self._opened_at + self.reset_timeout - time.monotonic()
+        if retry_after > 0 or self._probe_in_flight:
+            raise UpstreamBlockedError(
+                ERROR_CIRCUIT_OPEN.format(retry_after=max(retry_after, 0))
+            )
+
+        # Half-open: this request is the probe.
+        self._probe_in_flight = True
+        try:
+            page = await self.upstream.download(url)
+        except Exception:
+            self._opened_at = time.monotonic()
+            raise
+        finally:
+            self._probe_in_flight = False
+        self._failures = 0
+        self._opened_at = None
+        return page
+
+    async def _download(self, url: str) -> str:
+        try:
+            page = await self.upstream.download(url)
+        except UpstreamBlockedError:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            raise
+        self._failures = 0
+        return page
@@ -0,0 +1,117 @@
+import time
+from typing import List, Optional, Sequence
+
+from loguru import logger
+
+from linguee_api.downloaders.interfaces import IDownloader, UpstreamBlockedError
+
+ERROR_ALL_ROUTES_BLOCKED = (
+    "All egress routes of the API proxy are temporarily blocked by Linguee. "
+    "Try again in {retry_after:.0f} seconds."
+)
+
+
+class EgressRoute:
+    """One way out to linguee.com, with its own health statistics."""
+
+    # Weight of the latest latency in the moving average.
+    latency_smoothing = 0.2
+
+    def __init__(self, name: str, downloader: IDownloader):
+        self.name = name
+        self.downloader = downloader
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.blocks = 0
+        self.latency: Optional[float] = None
+        self.ejected_until = 0.0
+
+    def is_ejected(self, now: float) -> bool:
+        return now < self.ejected_until
+
+    def record_latency(self, latency: float) -> None:
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.latency_smoothing * (latency - self.latency)
+
+
+class EgressPoolDownloader(IDownloader):
+    """
+    Spread requests across a pool of egress routes.
+
+    Each route is a downloader, usually an HTTPXDownloader with its own HTTP
+    proxy or local source address. Every request goes to the least loaded route:
+    the one with the fewest requests in flight, and then the fastest one.
+
+    When Linguee blocks a route (returns 503), the route is ejected from the
+    pool for ejection_time seconds, and the request is tried on the next route.
+    If all the routes are ejected, downloads fail right away with
+    UpstreamBlockedError.
+    """
+
+    def __init__(
+        self,
+        routes: Sequence[EgressRoute],
+        *,
+        ejection_time: float = 300.0,
+    ):
+        if not routes:
+            raise ValueError("The pool needs at least one egress route")
+        self.routes = list(routes)
+        self.ejection_time = ejection_time
+
+    async def open(self) -> None:
+        for route in self.routes:
+            await route.downloader.open()
+
+    async def close(self) -> None:
+        for route in self.routes:
+            await route.downloader.close()
+
+    async def download(self, url: str) -> str:
+        tried: List[EgressRoute] = []
+        while True:
+            route = self._choose_route(exclude=tried)
+            tried.append(route)
+            try:
+                return await self._download(route, url)
+            except UpstreamBlockedError:
+                route.blocks += 1
+                route.ejected_until = time.monotonic() + self.ejection_time
+                logger.warning(
+                    f"Egress route is blocked, ejecting it for "
+                    f"{self.ejection_time}s: {route.name=}"
+                )
+
+    async def _download(self, route: EgressRoute, url: str) -> str:
+        route.in_flight += 1
+        route.requests += 1
+        started_at = time.monotonic()
+        try:
+            page = await route.downloader.download(url)
+        except Exception:
+            route.errors += 1
+            raise
+        finally:
+            route.in_flight -= 1
+        route.record_latency(time.monotonic() - started_at)
+        return page
+
+    def _choose_route(self, exclude: Sequence[EgressRoute]) -> EgressRoute:
+        now = time.monotonic()
+        candidates = [
+            route
+            for route in self.routes
+            if not route.is_ejected(now) and route not in exclude
+        ]
+        if not candidates:
+            retry_after = min(route.ejected_until for route in self.routes) - now
+            raise UpstreamBlockedError(
+                ERROR_ALL_ROUTES_BLOCKED.format(retry_after=max(retry_after, 0))
+            )
+        return min(
+            candidates,
+            key=lambda route: (route.in_flight, route.latency or 0.0),
+        )
@@ -1,27 +1,133 @@
+import asyncio
+import hashlib
+import os
 import pathlib
+import tempfile
 import urllib.parse
-from typing import Optional
+from typing import Callable, Optional, Tuple, TypeVar
 
-from linguee_api.downloaders.interfaces import ICache, IDownloader
+from loguru import logger
+
+from linguee_api.downloaders.interfaces import CacheEntry, ICache, IDownloader
+from linguee_api.downloaders.page_codec import PageCodec, PageDecodeError
+
+T = TypeVar("T")
 
 
 class FileCache(ICache):
-    """File Cache."""
+    """File Cache.
+
+    Pages are stored encoded with the codec, compressed by default.
+
+    File names are SHA-256 hashes of URLs, sharded into two levels of
+    directories by the first bytes of the hash ("ab/cd/abcd..."), so that no
+    directory grows too large. Pages are written to a temporary file and renamed,
+    so readers never see a partially written page. All file operations run in
+    a thread pool, off the event loop.
+
+    Older versions stored pages in one flat directory, with quoted URLs as file
+    names. These files are moved to the new layout when read, or all at once
+    with migrate_flat_layout().
 
-    def __init__(self, cache_directory: pathlib.Path, upstream: IDownloader):
+    The age of a page is the age of its file. Pages older than hard_ttl seconds
+    are downloaded again, and pages older than soft_ttl seconds are returned as
+    is, and refreshed in the background (see ICache).
+    """
+
+    def __init__(
+        self,
+        cache_directory: pathlib.Path,
+        upstream: IDownloader,
+        *,
+        codec: Optional[PageCodec] = None,
+        soft_ttl: Optional[float] = None,
+        hard_ttl: Optional[float] = None,
+        max_background_refreshes: int = 10,
+    ):
         self.cache_directory = cache_directory
         self.upstream = upstream
+        self.codec = codec or PageCodec()
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        self.max_background_refreshes = max_background_refreshes
         self.cache_directory.mkdir(parents=True, exist_ok=True)
 
     async def get_from_cache(self, url: str) -> Optional[str]:
-        page_file = self._get_page_file(url)
-        if page_file.is_file():
-            return page_file.read_text(encoding="utf-8")
-        return None
+        entry = await self.get_cache_entry(url)
+        return None if entry is None else entry.page
+
+    async def get_cache_entry(self, url: str) -> Optional[CacheEntry]:
+        result = await self._run_in_thread(lambda: self._read_page_file(url))
+        if result is None:
+            return None
+        data, created_at = result
+        try:
+            page = self.codec.decode(data)
+        except PageDecodeError as e:
+            # Treat as a miss. The page will be downloaded and overwritten.
+            logger.warning(f"Cannot decode cached page: {e=}, {url=}")
+            return None
+        return CacheEntry(page=page, created_at=created_at)
 
     async def put_to_cache(self, url: str, page: str) -> None:
+        data = self.codec.encode(page)
+        await self._run_in_thread(lambda: self._write_page_file(url, data))
+
+    async def migrate_flat_layout(self) -> int:
+        """Move all pages from the flat layout. Return the number of moved pages."""
+        return await self._run_in_thread(self._migrate_flat_layout)
+
+    def _read_page_file(self, url: str) -> Optional[Tuple[bytes, float]]:
+        """Return the contents of the page file and its modification time."""
+        page_file = self._get_page_file(url)
+        if not page_file.exists() and not self._migrate_legacy_page_file(url):
+            return None
+        try:
+            with page_file.open("rb") as f:
+                return f.read(), os.fstat(f.fileno()).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def _write_page_file(self, url: str, data: bytes) -> None:
+        page_file = self._get_page_file(url)
+        page_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=page_file.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_name, page_file)
+        except BaseException:
+            os.unlink(temp_name)
+            raise
+
+    def _migrate_flat_layout(self) -> int:
+        migrated = 0
+        for legacy_file in self.cache_directory.iterdir():
+            if legacy_file.is_file() and "%" in legacy_file.name:
+                url = urllib.parse.unquote(legacy_file.name)
+                if self._migrate_legacy_page_file(url):
+                    migrated += 1
+        logger.info(f"Moved {migrated} pages from the flat file cache layout")
+        return migrated
+
+    def _migrate_legacy_page_file(self, url: str) -> bool:
+        legacy_file = self._get_legacy_page_file(url)
         page_file = self._get_page_file(url)
-        page_file.write_text(page, encoding="utf-8")
+        page_file.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(legacy_file, page_file)
+        except FileNotFoundError:
+            return False
+        return True
 
     def _get_page_file(self, url: str) -> pathlib.Path:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.cache_directory / digest[:2] / digest[2:4] / digest
+
+    def _get_legacy_page_file(self, url: str) -> pathlib.Path:
         return self.cache_directory / urllib.parse.quote(url, safe="")
+
+    @staticmethod
+    async def _run_in_thread(func: Callable[[], T]) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func)
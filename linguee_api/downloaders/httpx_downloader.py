@@ -1,6 +1,13 @@
+from typing import Optional
+
 import httpx
 
-from linguee_api.downloaders.interfaces import DownloaderError, IDownloader
+from linguee_api.downloaders.interfaces import (
+    DownloaderError,
+    IDownloader,
+    TransientDownloaderError,
+    UpstreamBlockedError,
+)
 
 ERROR_503 = (
     "The Linguee server returned 503. The API proxy was temporarily blocked by "
@@ -8,26 +15,101 @@ ERROR_503 = (
     "the-api-server-returns-the-linguee-server-returned-503"
 )
 
+# Responses that are worth retrying. 503 is not one of them, it means that
+# Linguee blocked us.
+TRANSIENT_STATUS_CODES = {500, 502, 504}
+
 
 class HTTPXDownloader(IDownloader):
     """
     Real downloader.
 
-    Sends request to linguee.com to read the page.
+    Sends request to linguee.com to read the page. All requests share the same
+    client, so that connections to linguee.com are kept alive and reused between
+    requests. The client is created on open() or on the first download, and
+    released on close().
+
+    Requests go through the HTTP proxy, if provided, and leave from the local
+    address, if provided.
     """
 
+    def __init__(
+        self,
+        *,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 10.0,
+        pool_timeout: float = 5.0,
+        http2: bool = False,
+        proxy: Optional[str] = None,
+        local_address: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(
+            read_timeout,
+            connect=connect_timeout,
+            pool=pool_timeout,
+        )
+        self.http2 = http2
+        self.proxy = proxy
+        self.local_address = local_address
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def open(self) -> None:
+        self._get_client()
+
+    async def close(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
     async def download(self, url: str) -> str:
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url)
-            except httpx.ConnectError as e:
-                raise DownloaderError(str(e)) from e
-
-            if response.status_code == 503:
-                raise DownloaderError(ERROR_503)
-
-            if response.status_code != 200:
-                raise DownloaderError(
-                    f"The Linguee server returned {response.status_code}"
-                )
-            return response.text
+        client = self._get_client()
+        try:
+            response = await client.get(url)
+        except httpx.TransportError as e:
+            raise TransientDownloaderError(str(e) or repr(e)) from e
+
+        if response.status_code == 503:
+            raise UpstreamBlockedError(ERROR_503)
+
+        if response.status_code in TRANSIENT_STATUS_CODES:
+            raise TransientDownloaderError(
+                f"The Linguee server returned {response.status_code}"
+            )
+
+        if response.status_code != 200:
+            raise DownloaderError(f"The Linguee server returned {response.status_code}")
+        return response.text
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2,
+                transport=self._get_transport(),
+            )
+        return self._client
+
+    def _get_transport(self) -> Optional[httpx.AsyncBaseTransport]:
+        if self.transport is not None:
+            return self.transport
+        if self.proxy is None and self.local_address is None:
+            return None
+        # The client ignores its own limits and http2 flag when the transport is
+        # provided, so the transport gets them instead.
+        return httpx.AsyncHTTPTransport(
+            limits=self.limits,
+            http2=self.http2,
+            proxy=httpx.Proxy(self.proxy) if self.proxy else None,
+            local_address=self.local_address,
+        )
@@ -1,22 +1,72 @@
 import abc
-from typing import Optional
+import asyncio
+import time
+from typing import Dict, NamedTuple, Optional
+
+from loguru import logger
 
 
 class DownloaderError(Exception):
     pass
 
 
+class UpstreamBlockedError(DownloaderError):
+    """Linguee blocked the API proxy (returned 503)."""
+
+
+class TransientDownloaderError(DownloaderError):
+    """A failure that is likely to go away on retry, such as a network error."""
+
+
 class IDownloader(abc.ABC):
     @abc.abstractmethod
     async def download(self, url: str) -> str:
         """Download a page or raise an exception"""
         ...
 
+    async def open(self) -> None:
+        """Acquire long-lived resources. Called once on application startup."""
+
+    async def close(self) -> None:
+        """Release long-lived resources. Called once on application shutdown."""
+
 
-class ICache(IDownloader, abc.ABC):
+class IDownloaderWrapper(IDownloader, abc.ABC):
+    """A downloader that adds behavior on top of the upstream downloader."""
 
     upstream: IDownloader
 
+    async def open(self) -> None:
+        await self.upstream.open()
+
+    async def close(self) -> None:
+        await self.upstream.close()
+
+
+class CacheEntry(NamedTuple):
+    page: str
+    # Unix time when the page was put to the cache, or None if unknown.
+    created_at: Optional[float]
+
+
+class ICache(IDownloaderWrapper, abc.ABC):
+    """
+    Cache on top of the upstream downloader.
+
+    Supports stale-while-revalidate. Pages older than soft_ttl seconds are stale:
+    they are returned immediately, and refreshed from the upstream in the
+    background. Only one refresh per URL runs at a time, and at most
+    max_background_refreshes refreshes in total, the rest of the stale pages are
+    returned without scheduling a refresh. Pages older than hard_ttl seconds are
+    ignored and downloaded again. Pages of unknown age are never stale.
+    """
+
+    upstream: IDownloader
+    soft_ttl: Optional[float] = None
+    hard_ttl: Optional[float] = None
+    max_background_refreshes: int = 10
+    _background_refreshes: "Optional[Dict[str, asyncio.Task[None]]]" = None
+
     @abc.abstractmethod
     async def get_from_cache(self, url: str) -> Optional[str]:
         """Return a page from the cache."""
@@ -27,9 +77,71 @@ class ICache(IDownloader, abc.ABC):
         """Put a page to the cache."""
         ...
 
-    async def download(self, url: str) -> str:
+    async def close(self) -> None:
+        await self._cancel_background_refreshes()
+        await super().close()
+
+    async def get_cache_entry(self, url: str) -> Optional[CacheEntry]:
+        """Return a page from the cache along with its creation time."""
         page = await self.get_from_cache(url)
         if page is None:
-            page = await self.upstream.download(url)
-            await self.put_to_cache(url, page)
-        return page
+            return None
+        return CacheEntry(page=page, created_at=None)
+
+    async def put_cache_entry(self, url: str, entry: CacheEntry) -> None:
+        """Put a page, downloaded from the upstream, to the cache.
+
+        The entry has the creation time of the page in the upstream cache, if
+        the upstream is a cache. Caches that store the creation time use it, so
+        that a stale page doesn't look fresh in the upper tier.
+        """
+        await self.put_to_cache(url, entry.page)
+
+    async def download(self, url: str) -> str:
+        entry = await self.download_entry(url)
+        return entry.page
+
+    async def download_entry(self, url: str) -> CacheEntry:
+        """Same as download(), along with the creation time of the page."""
+        entry = await self.get_cache_entry(url)
+        if entry is not None:
+            age = 0.0 if entry.created_at is None else time.time() - entry.created_at
+            if self.hard_ttl is None or age <= self.hard_ttl:
+                if self.soft_ttl is not None and age > self.soft_ttl:
+                    self._schedule_background_refresh(url)
+                return entry
+        return await self._refresh(url)
+
+    async def _refresh(self, url: str) -> CacheEntry:
+        if isinstance(self.upstream, ICache):
+            entry = await self.upstream.download_entry(url)
+        else:
+            entry = CacheEntry(page=await self.upstream.download(url), created_at=None)
+        if entry.created_at is None:
+            entry = entry._replace(created_at=time.time())
+        await self.put_cache_entry(url, entry)
+        return entry
+
+    def _schedule_background_refresh(self, url: str) -> None:
+        if self._background_refreshes is None:
+            self._background_refreshes = {}
+        refreshes = self._background_refreshes
+        if url in refreshes or len(refreshes) >= self.max_background_refreshes:
+            return
+        refreshes[url] = asyncio.ensure_future(self._refresh_in_background(url))
+
+    async def _refresh_in_background(self, url: str) -> None:
+        try:
+            await self._refresh(url)
+        except Exception as error:
+            logger.warning(f"Error refreshing stale page: {error=}, {url=}")
+        finally:
+            assert self._background_refreshes is not None
+            self._background_refreshes.pop(url, None)
+
+    async def _cancel_background_refreshes(self) -> None:
+        if self._background_refreshes:
+            tasks = list(self._background_refreshes.values())
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
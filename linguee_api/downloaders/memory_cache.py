@@ -1,18 +1,146 @@
-from async_lru import alru_cache
+import sys
+from collections import OrderedDict
+from typing import List, Optional
 
-from linguee_api.downloaders.interfaces import IDownloader
+from linguee_api.downloaders.interfaces import ICache, IDownloader
 
+# Maps every counter value to the half of it, for bytearray.translate().
+_HALVE = bytes(value >> 1 for value in range(256))
 
-class MemoryCache(IDownloader):
+
+class FrequencySketch:
+    """Approximate access frequencies of keys, for the TinyLFU admission policy.
+
+    A count-min sketch with `depth` rows of `width` 4-bit counters. Once the
+    number of recorded accesses reaches ten times the width, all counters are
+    halved, so that old popularity fades away.
+    """
+
+    max_count = 15
+
+    def __init__(self, width: int = 4096, depth: int = 4):
+        # Round the width up to a power of two, so that we can mask hashes.
+        self.width = 1 << max(width - 1, 1).bit_length()
+        self.depth = depth
+        self.sample_size = 10 * self.width
+        self._rows = [bytearray(self.width) for _ in range(depth)]
+        self._additions = 0
+
+    def increment(self, key: str) -> None:
+        mask = self.width - 1
+        for seed, row in enumerate(self._rows):
+            index = hash((seed, key)) & mask
+            if row[index] < self.max_count:
+                row[index] += 1
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._reset()
+
+    def frequency(self, key: str) -> int:
+        mask = self.width - 1
+        return min(row[hash((seed, key)) & mask] for seed, row in enumerate(self._rows))
+
+    def clear(self) -> None:
+        for row in self._rows:
+            row[:] = bytes(self.width)
+        self._additions = 0
+
+    def _reset(self) -> None:
+        for row in self._rows:
+            row[:] = row.translate(_HALVE)
+        self._additions //= 2
+
+
+class MemoryCache(ICache):
     """Memory cache.
 
     Exposes the downloader interface, but requires the upstream to work and
     keeps records in memory.
+
+    The cache is bounded by the total size of URLs and pages in bytes, and
+    optionally by the number of entries. Pages are evicted in the least recently
+    used order, but a new page is only admitted if it's accessed at least as
+    often as the pages it would evict (TinyLFU), so that a burst of one-off
+    queries doesn't push out popular words.
     """
 
-    def __init__(self, upstream: IDownloader, maxsize: int = 1000):
+    def __init__(
+        self,
+        upstream: IDownloader,
+        maxsize: Optional[int] = None,
+        *,
+        max_bytes: int = 64 * 1024 * 1024,
+        sketch_width: int = 4096,
+    ):
         self.upstream = upstream
-        self.download = alru_cache(maxsize=maxsize)(self.download)  # type: ignore
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.sketch = FrequencySketch(width=sketch_width)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejections = 0
+        self.bytes = 0
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_from_cache(self, url: str) -> Optional[str]:
+        self.sketch.increment(url)
+        page = self._entries.get(url)
+        if page is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(url)
+        self.hits += 1
+        return page
+
+    async def put_to_cache(self, url: str, page: str) -> None:
+        if url in self._entries:
+            self._remove(url)
+        size = self._get_size(url, page)
+        victims = self._get_victims(url, size)
+        if victims is None:
+            self.rejections += 1
+            return
+        for victim in victims:
+            self._remove(victim)
+            self.evictions += 1
+        self._entries[url] = page
+        self.bytes += size
+
+    def clear(self) -> None:
+        """Remove all pages and reset the frequencies, but not the counters."""
+        self._entries.clear()
+        self.sketch.clear()
+        self.bytes = 0
+
+    def _get_victims(self, url: str, size: int) -> Optional[List[str]]:
+        """Return the pages to evict to fit the new one, or None to reject it."""
+        if size > self.max_bytes:
+            return None
+        frequency = self.sketch.frequency(url)
+        victims: List[str] = []
+        freed = 0
+        for victim, page in self._entries.items():
+            if not self._is_over_limit(len(victims), freed, size):
+                break
+            if self.sketch.frequency(victim) > frequency:
+                return None
+            victims.append(victim)
+            freed += self._get_size(victim, page)
+        return victims
+
+    def _is_over_limit(self, evicted: int, freed: int, size: int) -> bool:
+        if self.bytes - freed + size > self.max_bytes:
+            return True
+        return self.maxsize is not None and len(self._entries) - evicted >= self.maxsize
+
+    def _remove(self, url: str) -> None:
+        page = self._entries.pop(url)
+        self.bytes -= self._get_size(url, page)
 
-    async def download(self, url: str) -> str:
-        return await self.upstream.download(url)
+    @staticmethod
+    def _get_size(url: str, page: str) -> int:
+        return sys.getsizeof(url) + sys.getsizeof(page)
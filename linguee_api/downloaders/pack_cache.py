@@ -0,0 +1,193 @@
+"""
+Read-only cache pack.
+
+A pack is an immutable file with pre-warmed pages, shipped to every node as is.
+The layout, all numbers little-endian:
+
+    header:  magic (8 bytes), entry count (uint64), index offset (uint64)
+    data:    for every page, the URL in UTF-8 followed by the encoded page
+    index:   for every page, the URL hash (uint64), the offset of its data
+             (uint64), the URL length (uint32) and the page length (uint32),
+             sorted by the URL hash
+
+Pages are encoded with PageCodec, the same way as in SQLiteCache, so the pack
+can be built from the SQLite cache without re-encoding pages. The file is read
+through mmap, and lookups are binary searches over the index, without
+syscalls or copies, other than decoding the page.
+"""
+import hashlib
+import mmap
+import os
+import pathlib
+import struct
+import tempfile
+from typing import Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from linguee_api.downloaders.interfaces import ICache, IDownloader
+from linguee_api.downloaders.page_codec import PageCodec, PageDecodeError
+
+MAGIC = b"LGPACK01"
+HEADER = struct.Struct("<8sQQ")
+INDEX_ENTRY = struct.Struct("<QQII")
+INDEX_HASH = struct.Struct("<Q")
+
+
+def get_url_hash(url_bytes: bytes) -> int:
+    digest = hashlib.blake2b(url_bytes, digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def write_pack(pack_file: pathlib.Path, pages: Iterable[Tuple[str, bytes]]) -> int:
+    """Write encoded pages to the pack file. Return the number of pages.
+
+    The pack is written to a temporary file and renamed, so readers never see a
+    partially written pack.
+    """
+    pack_file.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=pack_file.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            index: List[Tuple[int, int, int, int]] = []
+            offset = HEADER.size
+            f.write(b"\0" * HEADER.size)
+            for url, data in pages:
+                url_bytes = url.encode("utf-8")
+                f.write(url_bytes)
+                f.write(data)
+                index.append(
+                    (get_url_hash(url_bytes), offset, len(url_bytes), len(data))
+                )
+                offset += len(url_bytes) + len(data)
+            index.sort()
+            for entry in index:
+                f.write(INDEX_ENTRY.pack(*entry))
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, len(index), offset))
+        os.replace(temp_name, pack_file)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+    return len(index)
+
+
+class PackCache(ICache):
+    """Read-only cache over a pack file.
+
+    Pages that are not in the pack are downloaded from the upstream, usually
+    SQLiteCache, and are not stored anywhere at this level. If the pack file
+    doesn't exist, every page is a miss.
+
+    The pack is mapped to memory on open() or on the first access, and unmapped
+    on close().
+    """
+
+    def __init__(
+        self,
+        pack_file: pathlib.Path,
+        upstream: IDownloader,
+        *,
+        codec: Optional[PageCodec] = None,
+    ):
+        self.pack_file = pack_file
+        self.upstream = upstream
+        self.codec = codec or PageCodec()
+        self._mmap: Optional[mmap.mmap] = None
+        self._count = 0
+        self._index_offset = 0
+        self._loaded = False
+
+    def __len__(self) -> int:
+        self._load()
+        return self._count
+
+    async def open(self) -> None:
+        self._load()
+        await self.upstream.open()
+
+    async def close(self) -> None:
+        await self._cancel_background_refreshes()
+        mapped, self._mmap = self._mmap, None
+        self._count = 0
+        self._loaded = False
+        if mapped is not None:
+            mapped.close()
+        await self.upstream.close()
+
+    async def get_from_cache(self, url: str) -> Optional[str]:
+        self._load()
+        if self._mmap is None:
+            return None
+        url_bytes = url.encode("utf-8")
+        location = self._find(url_bytes)
+        if location is None:
+            return None
+        start, length = location
+        try:
+            with memoryview(self._mmap) as view, view[start : start + length] as data:
+                return self.codec.decode(data)
+        except PageDecodeError as e:
+            logger.warning(f"Cannot decode page from the pack: {e=}, {url=}")
+            return None
+
+    async def put_to_cache(self, url: str, page: str) -> None:
+        """The pack is read-only."""
+
+    def _find(self, url_bytes: bytes) -> Optional[Tuple[int, int]]:
+        """Return the offset and the length of the encoded page, or None."""
+        assert self._mmap is not None
+        mapped = self._mmap
+        url_hash = get_url_hash(url_bytes)
+
+        # Find the first entry with the hash
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            (mid_hash,) = INDEX_HASH.unpack_from(
+                mapped, self._index_offset + mid * INDEX_ENTRY.size
+            )
+            if mid_hash < url_hash:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        # Different URLs may have the same hash. Compare the URLs.
+        for position in range(lo, self._count):
+            entry_hash, offset, url_length, page_length = INDEX_ENTRY.unpack_from(
+                mapped, self._index_offset + position * INDEX_ENTRY.size
+            )
+            if entry_hash != url_hash:
+                break
+            if url_length == len(url_bytes) and self._matches(offset, url_bytes):
+                return offset + url_length, page_length
+        return None
+
+    def _matches(self, offset: int, url_bytes: bytes) -> bool:
+        assert self._mmap is not None
+        with memoryview(self._mmap) as view:
+            with view[offset : offset + len(url_bytes)] as stored_url:
+                return stored_url == url_bytes
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with self.pack_file.open("rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError) as e:
+            # ValueError is raised for empty files, which can't be mapped
+            logger.warning(f"Cannot open the cache pack: {e=}, {self.pack_file=}")
+            return
+        magic, count, index_offset = (
+            HEADER.unpack_from(mapped) if len(mapped) >= HEADER.size else (b"", 0, 0)
+        )
+        if magic != MAGIC:
+            mapped.close()
+            logger.warning(f"Not a cache pack: {self.pack_file=}")
+            return
+        self._mmap = mapped
+        self._count = count
+        self._index_offset = index_offset
+        logger.info(f"Loaded {count} pages from the cache pack {self.pack_file}")
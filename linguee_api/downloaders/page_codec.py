@@ -0,0 +1,107 @@
+"""
+Compression of cached pages.
+
+Compressed pages start with a two-byte marker: a zero byte followed by the
+compression method. Linguee pages are HTML and never start with a zero byte, so
+anything without the marker is an uncompressed page, stored as is. That keeps
+the entries written before compression was enabled readable.
+
+The zstd method requires the optional "zstandard" package. A dictionary, trained
+on a sample of cached pages, improves the compression ratio of zstd a lot,
+because every Linguee page repeats the same markup.
+"""
+import zlib
+from typing import Iterable, List, Optional, Union
+
+from loguru import logger
+
+from linguee_api.const import COMPRESSION_METHOD
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None  # type: ignore
+
+
+ZLIB_MARKER = b"\x00Z"
+ZSTD_MARKER = b"\x00S"
+
+
+class PageDecodeError(Exception):
+    """The stored page can't be decoded.
+
+    For example, it was compressed with zstd with a different dictionary, or
+    zstandard is not installed.
+    """
+
+
+class PageCodec:
+    """Encode pages to bytes for storage and decode them back."""
+
+    def __init__(
+        self,
+        method: COMPRESSION_METHOD = "zlib",
+        *,
+        level: Optional[int] = None,
+        zstd_dictionary: Optional[bytes] = None,
+    ):
+        if method == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed. Falling back to zlib.")
+            method = "zlib"
+        self.method = method
+        self.level = level
+        self._zstd_compressor = None
+        self._zstd_decompressor = None
+        if zstandard is not None:
+            dict_data = (
+                zstandard.ZstdCompressionDict(zstd_dictionary)
+                if zstd_dictionary
+                else None
+            )
+            self._zstd_compressor = zstandard.ZstdCompressor(
+                level=3 if level is None else level, dict_data=dict_data
+            )
+            self._zstd_decompressor = zstandard.ZstdDecompressor(dict_data=dict_data)
+
+    def encode(self, page: str) -> bytes:
+        data = page.encode("utf-8")
+        if self.method == "zlib":
+            level = -1 if self.level is None else self.level
+            return ZLIB_MARKER + zlib.compress(data, level)
+        if self.method == "zstd":
+            assert self._zstd_compressor is not None
+            return ZSTD_MARKER + self._zstd_compressor.compress(data)
+        return data
+
+    def decode(self, data: Union[str, bytes, memoryview]) -> str:
+        """Decode the page or raise PageDecodeError."""
+        if isinstance(data, str):
+            return data
+        try:
+            return self._decode(data)
+        except PageDecodeError:
+            raise
+        except Exception as e:
+            raise PageDecodeError(str(e)) from e
+
+    def _decode(self, data: Union[bytes, memoryview]) -> str:
+        marker = bytes(data[:2])
+        if marker == ZLIB_MARKER:
+            return zlib.decompress(data[2:]).decode("utf-8")
+        if marker == ZSTD_MARKER:
+            if self._zstd_decompressor is None:
+                raise PageDecodeError(
+                    "The page is compressed with zstd, but zstandard is not installed"
+                )
+            return self._zstd_decompressor.decompress(data[2:]).decode("utf-8")
+        return bytes(data).decode("utf-8")
+
+
+def train_zstd_dictionary(pages: Iterable[str], dict_size: int = 112640) -> bytes:
+    """Train a zstd dictionary on a sample of pages."""
+    if zstandard is None:
+        raise RuntimeError("zstandard is not installed")
+    samples: List[Union[bytes, bytearray, memoryview]] = [
+        page.encode("utf-8") for page in pages
+    ]
+    return zstandard.train_dictionary(dict_size, samples).as_bytes()
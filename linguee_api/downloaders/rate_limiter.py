@@ -0,0 +1,66 @@
+import asyncio
+from typing import Optional
+
+from linguee_api.downloaders.interfaces import (
+    DownloaderError,
+    IDownloader,
+    IDownloaderWrapper,
+)
+
+
+class RateLimitedDownloader(IDownloaderWrapper):
+    """
+    Outbound rate limiter.
+
+    A token bucket: up to `burst` requests go to the upstream at once, after that
+    requests are sent at `rate` requests per second, and the rest wait for their
+    turn, in the order of arrival. If the wait is longer than max_delay seconds,
+    the request fails right away instead.
+
+    Sits in front of HTTPXDownloader, so that a cold cache and a traffic spike
+    don't make Linguee block the API proxy.
+    """
+
+    def __init__(
+        self,
+        upstream: IDownloader,
+        *,
+        rate: float,
+        burst: int = 10,
+        max_delay: Optional[float] = None,
+    ):
+        self.upstream = upstream
+        self.rate = rate
+        self.burst = burst
+        self.max_delay = max_delay
+        self._tokens = float(burst)
+        self._updated_at: Optional[float] = None
+
+    async def download(self, url: str) -> str:
+        await self._acquire()
+        return await self.upstream.download(url)
+
+    async def _acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if self._updated_at is not None:
+            elapsed = now - self._updated_at
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated_at = now
+
+        # Tokens go below zero when requests are waiting. Every waiting request
+        # has taken its token in advance, so the next one waits for all of them.
+        delay = (1 - self._tokens) / self.rate
+        if self.max_delay is not None and delay > self.max_delay:
+            raise DownloaderError(
+                "Too many requests to the Linguee server. Try again later."
+            )
+        self._tokens -= 1
+        if delay <= 0:
+            return
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            # Give the token back.
+            self._tokens += 1
+            raise
@@ -0,0 +1,125 @@
+import math
+import time
+from typing import Optional
+
+from loguru import logger
+
+from linguee_api.downloaders.interfaces import CacheEntry, ICache, IDownloader
+from linguee_api.downloaders.page_codec import PageCodec, PageDecodeError
+
+try:
+    import redis.asyncio as aioredis
+    from redis import RedisError
+except ImportError:  # pragma: no cover
+    aioredis = None  # type: ignore
+    RedisError = Exception  # type: ignore
+
+
+class RedisCache(ICache):
+    """Redis Cache.
+
+    A cache shared by all the processes and machines of the deployment, kept in
+    Redis or any server speaking the Redis protocol. Requires the optional
+    "redis" package, version 5 or newer.
+
+    Every page is a hash with the encoded page and its creation time. Reads take
+    one round trip, and writes are pipelined. Pages expire after ttl seconds,
+    and are refreshed in the background after soft_ttl seconds (see ICache).
+
+    Connections come from a pool, created on open() or on the first access, and
+    closed on close(). If the server is unavailable, reads are treated as cache
+    misses, and writes are skipped, so the upstream keeps serving requests.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        upstream: IDownloader,
+        *,
+        codec: Optional[PageCodec] = None,
+        key_prefix: str = "linguee:page:",
+        ttl: Optional[int] = None,
+        max_connections: int = 20,
+        soft_ttl: Optional[float] = None,
+        max_background_refreshes: int = 10,
+    ):
+        if aioredis is None:
+            raise RuntimeError("redis is not installed")
+        self.redis_url = redis_url
+        self.upstream = upstream
+        self.codec = codec or PageCodec()
+        self.key_prefix = key_prefix
+        self.ttl = ttl
+        self.max_connections = max_connections
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = ttl
+        self.max_background_refreshes = max_background_refreshes
+        self._client: Optional["aioredis.Redis"] = None
+
+    async def open(self) -> None:
+        self._get_client()
+        await self.upstream.open()
+
+    async def close(self) -> None:
+        await self._cancel_background_refreshes()
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+        await self.upstream.close()
+
+    async def get_from_cache(self, url: str) -> Optional[str]:
+        entry = await self.get_cache_entry(url)
+        return None if entry is None else entry.page
+
+    async def get_cache_entry(self, url: str) -> Optional[CacheEntry]:
+        try:
+            data, created_at = await self._get_client().hmget(
+                self._get_key(url), ["page", "created_at"]
+            )
+        except RedisError as e:
+            logger.warning(f"Cannot read from the Redis cache: {e=}, {url=}")
+            return None
+        if data is None:
+            return None
+        try:
+            page = self.codec.decode(data)
+        except PageDecodeError as e:
+            # Treat as a miss. The page will be downloaded and overwritten.
+            logger.warning(f"Cannot decode cached page: {e=}, {url=}")
+            return None
+        return CacheEntry(
+            page=page, created_at=None if created_at is None else float(created_at)
+        )
+
+    async def put_to_cache(self, url: str, page: str) -> None:
+        await self.put_cache_entry(url, CacheEntry(page=page, created_at=time.time()))
+
+    async def put_cache_entry(self, url: str, entry: CacheEntry) -> None:
+        # Keep the creation time of the page in the lower tier, so that a stale
+        # page doesn't look fresh, and doesn't outlive the hard TTL.
+        created_at = time.time() if entry.created_at is None else entry.created_at
+        key = self._get_key(url)
+        try:
+            async with self._get_client().pipeline(transaction=False) as pipe:
+                pipe.hset(
+                    key,
+                    mapping={
+                        "page": self.codec.encode(entry.page),
+                        "created_at": created_at,
+                    },
+                )
+                if self.ttl is not None:
+                    pipe.expireat(key, math.ceil(created_at + self.ttl))
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Cannot write to the Redis cache: {e=}, {url=}")
+
+    def _get_key(self, url: str) -> str:
+        return self.key_prefix + url
+
+    def _get_client(self) -> "aioredis.Redis":
+        if self._client is None:
+            self._client = aioredis.Redis.from_url(
+                self.redis_url, max_connections=self.max_connections
+            )
+        return self._client
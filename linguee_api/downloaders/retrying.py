@@ -0,0 +1,121 @@
+import asyncio
+import random
+from collections import deque
+from typing import Deque, Optional
+
+from loguru import logger
+
+from linguee_api.downloaders.interfaces import (
+    DownloaderError,
+    IDownloader,
+    IDownloaderWrapper,
+    TransientDownloaderError,
+)
+
+
+class RetryingDownloader(IDownloaderWrapper):
+    """
+    Retries with backoff, and hedged requests.
+
+    Downloads that fail with TransientDownloaderError (network errors, timeouts,
+    500, 502 and 504 responses) are retried up to max_attempts times in total.
+    Before each retry, we wait for a random time between zero and the backoff,
+    which starts at `backoff` seconds and doubles with every attempt, up to
+    max_backoff. Other errors, including 503 blocks, are never retried. All
+    attempts together take at most `deadline` seconds.
+
+    In the hedged mode, if an attempt hasn't finished in hedge_delay seconds,
+    a second request for the same URL is sent, and the first successful response
+    wins. When hedge_delay is not set, the 95th percentile of the latencies of
+    recent downloads is used, once there are enough of them.
+    """
+
+    min_latency_samples = 20
+
+    def __init__(
+        self,
+        upstream: IDownloader,
+        *,
+        max_attempts: int = 3,
+        backoff: float = 0.1,
+        max_backoff: float = 2.0,
+        deadline: float = 15.0,
+        hedge: bool = False,
+        hedge_delay: Optional[float] = None,
+        latency_window: int = 100,
+    ):
+        self.upstream = upstream
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+
+    async def download(self, url: str) -> str:
+        try:
+            return await asyncio.wait_for(self._download(url), self.deadline)
+        except asyncio.TimeoutError as e:
+            raise DownloaderError(
+                f"No response from the Linguee server in {self.deadline} seconds"
+            ) from e
+
+    async def _download(self, url: str) -> str:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return await self._attempt(url)
+            except TransientDownloaderError as error:
+                if attempt == self.max_attempts:
+                    raise
+                delay = random.uniform(
+                    0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+                )
+                logger.warning(
+                    f"Retrying download in {delay:.2f}s: {error=}, {url=}, {attempt=}"
+                )
+                await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+    async def _attempt(self, url: str) -> str:
+        hedge_delay = self._get_hedge_delay()
+        if hedge_delay is None:
+            return await self._timed_download(url)
+
+        first = asyncio.ensure_future(self._timed_download(url))
+        pending = {first}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=hedge_delay)
+            if done:
+                return first.result()
+            logger.info(f"Sending a hedged request: {url=}")
+            pending.add(asyncio.ensure_future(self._timed_download(url)))
+            while True:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                if not pending:
+                    return done.pop().result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _timed_download(self, url: str) -> str:
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        page = await self.upstream.download(url)
+        self._latencies.append(loop.time() - started_at)
+        return page
+
+    def _get_hedge_delay(self) -> Optional[float]:
+        if not self.hedge:
+            return None
+        if self.hedge_delay is not None:
+            return self.hedge_delay
+        if len(self._latencies) < self.min_latency_samples:
+            return None
+        latencies = sorted(self._latencies)
+        return latencies[int(0.95 * (len(latencies) - 1))]
@@ -0,0 +1,38 @@
+import asyncio
+from typing import Dict
+
+from linguee_api.downloaders.interfaces import IDownloader, IDownloaderWrapper
+
+
+class SingleFlightDownloader(IDownloaderWrapper):
+    """
+    Request coalescing layer.
+
+    Concurrent downloads of the same URL share one upstream request: the first
+    caller starts it, and everyone else awaits the same in-flight future. The
+    result (or the error) is delivered to all waiters, and forgotten as soon as
+    the request is finished, so nothing is cached here.
+
+    Can be put at any point of the downloader chain.
+    """
+
+    def __init__(self, upstream: IDownloader):
+        self.upstream = upstream
+        self._in_flight: Dict[str, "asyncio.Future[str]"] = {}
+
+    async def download(self, url: str) -> str:
+        future = self._in_flight.get(url)
+        if future is None:
+            future = asyncio.ensure_future(self.upstream.download(url))
+            self._in_flight[url] = future
+            future.add_done_callback(lambda f: self._forget(url, f))
+        # Shield the shared future, so that a cancelled waiter doesn't cancel the
+        # download for everyone else.
+        return await asyncio.shield(future)
+
+    def _forget(self, url: str, future: "asyncio.Future[str]") -> None:
+        if self._in_flight.get(url) is future:
+            del self._in_flight[url]
+        # Mark the exception as retrieved, in case all the waiters were cancelled.
+        if not future.cancelled():
+            future.exception()
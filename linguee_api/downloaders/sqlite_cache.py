@@ -1,44 +1,347 @@
+import asyncio
 import pathlib
-from typing import Optional
+import time
+from typing import Dict, List, Optional, Tuple
 
 import aiosqlite
+from loguru import logger
 
-from linguee_api.downloaders.interfaces import ICache, IDownloader
+from linguee_api.downloaders.interfaces import CacheEntry, ICache, IDownloader
+from linguee_api.downloaders.page_codec import PageCodec, PageDecodeError
 
 
 class SQLiteCache(ICache):
-    """SQLite Cache."""
+    """SQLite Cache.
 
-    def __init__(self, cache_database: pathlib.Path, upstream: IDownloader):
+    Keeps two long-lived connections to the database: one for reads and one
+    for writes. The database runs in WAL mode, so readers don't block behind
+    writers, and vice versa. Connections are opened on open() or on the first
+    access, and closed on close().
+
+    In the write-behind mode, put_to_cache() doesn't write to the database.
+    Instead, it puts the page to a bounded in-memory queue, and a background task
+    writes the queued pages in batches, one transaction per batch. When the queue
+    is full, put_to_cache() waits for the background task to catch up. Pages
+    waiting in the queue are visible to get_from_cache(), and the queue is
+    drained on close().
+
+    Pages are stored encoded with the codec, compressed by default.
+
+    Pages older than max_age seconds are considered expired. When the cache is
+    open, a background task periodically removes expired pages, and if the
+    database is larger than max_size bytes, the least recently used ones. Last
+    access times are collected in memory and saved by the same task, so reads
+    don't write to the database.
+
+    Pages older than soft_ttl seconds are returned as is, and refreshed in the
+    background (see ICache).
+    """
+
+    def __init__(
+        self,
+        cache_database: pathlib.Path,
+        upstream: IDownloader,
+        *,
+        codec: Optional[PageCodec] = None,
+        mmap_size: int = 256 * 1024 * 1024,
+        cache_size: int = 16 * 1024 * 1024,
+        write_behind: bool = False,
+        write_batch_size: int = 100,
+        write_flush_interval: float = 1.0,
+        write_queue_size: int = 1000,
+        max_age: Optional[int] = None,
+        max_size: Optional[int] = None,
+        cleanup_interval: float = 600.0,
+        soft_ttl: Optional[float] = None,
+        max_background_refreshes: int = 10,
+    ):
         self.cache_database = cache_database
         self.upstream = upstream
+        self.codec = codec or PageCodec()
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size
+        self.write_behind = write_behind
+        self.write_batch_size = write_batch_size
+        self.write_flush_interval = write_flush_interval
+        self.write_queue_size = write_queue_size
+        self.max_age = max_age
+        self.max_size = max_size
+        self.cleanup_interval = cleanup_interval
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = max_age
+        self.max_background_refreshes = max_background_refreshes
+        self._connections: Optional[
+            "asyncio.Future[Tuple[aiosqlite.Connection, aiosqlite.Connection]]"
+        ] = None
+        self._write_queue: "Optional[asyncio.Queue[Optional[Tuple[str, str]]]]" = None
+        self._write_task: "Optional[asyncio.Task[None]]" = None
+        self._pending_writes: Dict[str, str] = {}
+        self._access_times: Dict[str, int] = {}
+        self._cleanup_task: "Optional[asyncio.Task[None]]" = None
+
+    async def open(self) -> None:
+        await self._get_connections()
+        if self.max_age is not None or self.max_size is not None:
+            self._cleanup_task = asyncio.ensure_future(self._cleanup_loop())
+        await self.upstream.open()
+
+    async def close(self) -> None:
+        await self._cancel_background_refreshes()
+        if self._cleanup_task is not None:
+            self._cleanup_task.cancel()
+            await asyncio.gather(self._cleanup_task, return_exceptions=True)
+            self._cleanup_task = None
+        if self._write_queue is not None and self._write_task is not None:
+            await self._write_queue.put(None)
+            await self._write_task
+            self._write_queue = self._write_task = None
+        connections, self._connections = self._connections, None
+        if connections is not None:
+            reader, writer = await connections
+            await self._save_access_times(writer)
+            await reader.close()
+            await writer.close()
+        await self.upstream.close()
 
     async def get_from_cache(self, url: str) -> Optional[str]:
-        await self._ensure_database_initialized()
-        async with aiosqlite.connect(self.cache_database) as db:
-            async with db.execute(
-                "SELECT page FROM cache WHERE url = ?", [url]
-            ) as cursor:
-                row = await cursor.fetchone()
-                if row is None:
-                    return None
-        return row[0]
+        entry = await self.get_cache_entry(url)
+        return None if entry is None else entry.page
+
+    async def get_cache_entry(self, url: str) -> Optional[CacheEntry]:
+        if url in self._pending_writes:
+            return CacheEntry(page=self._pending_writes[url], created_at=time.time())
+        reader, _ = await self._get_connections()
+        async with reader.execute(
+            "SELECT page, strftime('%s', created_at) FROM cache "
+            "WHERE url = ? AND created_at >= ?",
+            [url, self._get_expiration_time()],
+        ) as cursor:
+            row = await cursor.fetchone()
+            if row is None:
+                return None
+        if self.max_size is not None:
+            self._access_times[url] = int(time.time())
+        try:
+            page = self.codec.decode(row[0])
+        except PageDecodeError as e:
+            # Treat as a miss. The page will be downloaded and overwritten.
+            logger.warning(f"Cannot decode cached page: {e=}, {url=}")
+            return None
+        created_at = None if row[1] is None else float(row[1])
+        return CacheEntry(page=page, created_at=created_at)
 
     async def put_to_cache(self, url: str, page: str) -> None:
-        async with aiosqlite.connect(self.cache_database) as db:
-            await db.execute("INSERT INTO cache (url, page) VALUES (?, ?)", [url, page])
-            await db.commit()
+        if self.write_behind:
+            await self._enqueue_write(url, page)
+        else:
+            await self._write_batch([(url, page)])
+
+    async def _enqueue_write(self, url: str, page: str) -> None:
+        if self._write_queue is None:
+            self._write_queue = asyncio.Queue(maxsize=self.write_queue_size)
+            self._write_task = asyncio.ensure_future(self._write_behind_loop())
+        self._pending_writes[url] = page
+        await self._write_queue.put((url, page))
+
+    async def _write_behind_loop(self) -> None:
+        assert self._write_queue is not None
+        queue = self._write_queue
+        stopped = False
+        while not stopped:
+            batch, stopped = await self._collect_batch(queue)
+            if batch:
+                await self._flush_batch(batch)
+
+    async def _collect_batch(
+        self, queue: "asyncio.Queue[Optional[Tuple[str, str]]]"
+    ) -> Tuple[List[Tuple[str, str]], bool]:
+        """Wait for the next batch of pages. Return the batch and the stop flag.
+
+        The batch is complete when it's full, or when the flush interval after
+        the first page in the batch is over. None in the queue stops the loop.
+        """
+        item = await queue.get()
+        if item is None:
+            return [], True
+        batch = [item]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.write_flush_interval
+        while len(batch) < self.write_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            # Don't use wait_for() here: before Python 3.12 it may drop the item
+            # if the timeout fires just as queue.get() completes. Cancelling a
+            # pending get() keeps the item in the queue.
+            get = asyncio.ensure_future(queue.get())
+            await asyncio.wait({get}, timeout=timeout)
+            if not get.done():
+                get.cancel()
+                break
+            item = get.result()
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _flush_batch(self, batch: List[Tuple[str, str]]) -> None:
+        try:
+            await self._write_batch(batch)
+        except Exception:
+            logger.exception(f"Error writing {len(batch)} pages to the cache")
+        for url, page in batch:
+            if self._pending_writes.get(url) is page:
+                del self._pending_writes[url]
+
+    async def _write_batch(self, batch: List[Tuple[str, str]]) -> None:
+        _, writer = await self._get_connections()
+        # Two concurrent cache misses for the same URL both end up here, so we
+        # replace the page rather than fail on the primary key.
+        now = int(time.time())
+        await writer.executemany(
+            "INSERT OR REPLACE INTO cache (url, page, accessed_at) VALUES (?, ?, ?)",
+            [(url, self.codec.encode(page), now) for url, page in batch],
+        )
+        await writer.commit()
 
-    async def _ensure_database_initialized(self):
-        if self.cache_database.is_file():
+    async def cleanup(self) -> None:
+        """Remove expired pages, then least recently used pages over max_size."""
+        _, writer = await self._get_connections()
+        await self._save_access_times(writer)
+        if self.max_age is not None:
+            await self._remove_expired(writer)
+        if self.max_size is not None:
+            await self._evict_least_recently_used(writer)
+        await self._vacuum(writer)
+
+    async def _remove_expired(self, writer: aiosqlite.Connection) -> None:
+        cursor = await writer.execute(
+            "DELETE FROM cache WHERE created_at < ?", [self._get_expiration_time()]
+        )
+        await writer.commit()
+        logger.info(f"Removed {cursor.rowcount} expired pages from the cache")
+
+    async def _evict_least_recently_used(self, writer: aiosqlite.Connection) -> None:
+        """Remove least recently used pages, until the cache fits into max_size.
+
+        The database size is only known in whole pages, and removing a few small
+        rows doesn't necessarily free one. Instead of removing rows until the
+        size goes down, we find out how many bytes to free, and remove the
+        shortest prefix of least recently used rows that holds that many bytes.
+        """
+        assert self.max_size is not None
+        excess_size = await self._get_used_size(writer) - self.max_size
+        if excess_size <= 0:
             return
-        self.cache_database.parent.mkdir(parents=True, exist_ok=True)
-        async with aiosqlite.connect(self.cache_database) as db:
-            await db.execute(
-                """CREATE TABLE IF NOT EXISTS cache (
-                    url TEXT PRIMARY KEY,
-                    page TEXT,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                )"""
+        cursor = await writer.execute(
+            """DELETE FROM cache WHERE url IN (
+                SELECT url FROM (
+                    SELECT
+                        url,
+                        SUM(length(url) + length(page)) OVER (
+                            ORDER BY accessed_at, url
+                            ROWS UNBOUNDED PRECEDING
+                        ) - length(url) - length(page) AS freed_before
+                    FROM cache
+                ) WHERE freed_before < ?
+            )""",
+            [excess_size],
+        )
+        await writer.commit()
+        logger.info(
+            f"Evicted {cursor.rowcount} least recently used pages from the cache"
+        )
+
+    async def _vacuum(self, writer: aiosqlite.Connection) -> None:
+        """Return free pages to the file system."""
+        if await self._get_pragma(writer, "auto_vacuum") != 2:
+            # The database was created before the incremental mode was enabled.
+            # A full vacuum switches it to the incremental mode, once.
+            logger.info("Switching the cache database to incremental vacuum")
+            await writer.execute("VACUUM")
+        else:
+            await writer.execute("PRAGMA incremental_vacuum")
+        await writer.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    async def _cleanup_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.cleanup_interval)
+            try:
+                await self.cleanup()
+            except Exception:
+                logger.exception("Error cleaning up the cache")
+
+    async def _save_access_times(self, writer: aiosqlite.Connection) -> None:
+        access_times, self._access_times = self._access_times, {}
+        if access_times:
+            await writer.executemany(
+                "UPDATE cache SET accessed_at = ? WHERE url = ?",
+                [(accessed_at, url) for url, accessed_at in access_times.items()],
             )
-            await db.commit()
+            await writer.commit()
+
+    def _get_expiration_time(self) -> str:
+        """Return the creation time of the oldest valid page, in SQLite format."""
+        if self.max_age is None:
+            return "0000-01-01 00:00:00"
+        expiration_time = time.gmtime(time.time() - self.max_age)
+        return time.strftime("%Y-%m-%d %H:%M:%S", expiration_time)
+
+    async def _get_used_size(self, db: aiosqlite.Connection) -> int:
+        """Return the size of the database, not counting free pages."""
+        page_count = await self._get_pragma(db, "page_count")
+        freelist_count = await self._get_pragma(db, "freelist_count")
+        page_size = await self._get_pragma(db, "page_size")
+        return (page_count - freelist_count) * page_size
+
+    @staticmethod
+    async def _get_pragma(db: aiosqlite.Connection, pragma: str) -> int:
+        async with db.execute(f"PRAGMA {pragma}") as cursor:
+            row = await cursor.fetchone()
+        return row[0] if row else 0
+
+    async def _get_connections(
+        self,
+    ) -> Tuple[aiosqlite.Connection, aiosqlite.Connection]:
+        # All the concurrent callers wait for the same connection attempt.
+        if self._connections is None:
+            self._connections = asyncio.ensure_future(self._connect())
+        try:
+            return await asyncio.shield(self._connections)
+        except Exception:
+            self._connections = None
+            raise
+
+    async def _connect(self) -> Tuple[aiosqlite.Connection, aiosqlite.Connection]:
+        self.cache_database.parent.mkdir(parents=True, exist_ok=True)
+        writer = await self._connect_one()
+        # Only takes effect for new databases. Existing databases need a VACUUM
+        # to switch to the incremental mode.
+        await writer.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        await writer.execute("PRAGMA journal_mode = WAL")
+        await writer.execute(
+            """CREATE TABLE IF NOT EXISTS cache (
+                url TEXT PRIMARY KEY,
+                page TEXT,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                accessed_at INTEGER
+            )"""
+        )
+        async with writer.execute("PRAGMA table_info(cache)") as cursor:
+            columns = [row[1] async for row in cursor]
+        if "accessed_at" not in columns:
+            await writer.execute("ALTER TABLE cache ADD COLUMN accessed_at INTEGER")
+        await writer.execute(
+            "CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)"
+        )
+        await writer.commit()
+        reader = await self._connect_one()
+        return reader, writer
+
+    async def _connect_one(self) -> aiosqlite.Connection:
+        db = await aiosqlite.connect(self.cache_database)
+        await db.execute("PRAGMA synchronous = NORMAL")
+        await db.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        # Negative cache_size is the size in KiB, rather than in pages.
+        await db.execute(f"PRAGMA cache_size = {-int(self.cache_size // 1024)}")
+        return db
@@ -0,0 +1,217 @@
+"""
+Construction of the Linguee client from settings.
+
+The API server and the command-line tools build the same downloader chain, so
+that they share caches, rate limits and everything else:
+
+    MemoryCache
+    -> SingleFlightDownloader
+    -> PackCache (optional)
+    -> RedisCache (optional)
+    -> SQLiteCache
+    -> CircuitBreakerDownloader
+    -> RetryingDownloader
+    -> EgressPoolDownloader (optional)
+    -> RateLimitedDownloader (optional, per egress route)
+    -> HTTPXDownloader
+"""
+from typing import Optional
+from urllib.parse import urlsplit
+
+from linguee_api.config import Settings
+from linguee_api.downloaders.circuit_breaker import CircuitBreakerDownloader
+from linguee_api.downloaders.egress_pool import EgressPoolDownloader, EgressRoute
+from linguee_api.downloaders.error_downloader import ErrorDownloader
+from linguee_api.downloaders.httpx_downloader import HTTPXDownloader
+from linguee_api.downloaders.interfaces import ICache, IDownloader
+from linguee_api.downloaders.memory_cache import MemoryCache
+from linguee_api.downloaders.pack_cache import PackCache
+from linguee_api.downloaders.page_codec import PageCodec
+from linguee_api.downloaders.rate_limiter import RateLimitedDownloader
+from linguee_api.downloaders.redis_cache import RedisCache
+from linguee_api.downloaders.retrying import RetryingDownloader
+from linguee_api.downloaders.single_flight import SingleFlightDownloader
+from linguee_api.downloaders.sqlite_cache import SQLiteCache
+from linguee_api.linguee_client import LingueeClient
+from linguee_api.negative_cache import NegativeCache
+from linguee_api.parse_profiler import parse_profiler
+from linguee_api.parser_pool import ParserPool
+from linguee_api.parsers import IParser
+from linguee_api.utils import import_string
+
+
+def make_client(settings: Settings) -> LingueeClient:
+    """Return a Linguee client. Call open() before use and close() after."""
+    page_codec = make_page_codec(settings)
+    page_parser = make_page_parser(settings)
+    return LingueeClient(
+        page_downloader=make_page_downloader(settings, page_codec),
+        page_parser=page_parser,
+        result_cache=make_result_cache(settings, page_codec),
+        negative_cache=make_negative_cache(settings),
+        parser_pool=make_parser_pool(settings, page_parser),
+    )
+
+
+def make_page_codec(settings: Settings) -> PageCodec:
+    return PageCodec(
+        settings.cache_compression,
+        level=settings.cache_compression_level,
+        zstd_dictionary=(
+            settings.cache_zstd_dictionary.read_bytes()
+            if settings.cache_zstd_dictionary
+            else None
+        ),
+    )
+
+
+def make_page_downloader(settings: Settings, page_codec: PageCodec) -> IDownloader:
+    """Return the chain of page caches on top of the upstream downloader."""
+    page_cache: IDownloader = SQLiteCache(
+        cache_database=settings.cache_database,
+        codec=page_codec,
+        mmap_size=settings.sqlite_mmap_size,
+        cache_size=settings.sqlite_cache_size,
+        write_behind=settings.sqlite_write_behind,
+        write_batch_size=settings.sqlite_write_batch_size,
+        write_flush_interval=settings.sqlite_write_flush_interval,
+        write_queue_size=settings.sqlite_write_queue_size,
+        max_age=settings.cache_max_age,
+        max_size=settings.cache_max_size,
+        cleanup_interval=settings.cache_cleanup_interval,
+        soft_ttl=settings.cache_soft_ttl,
+        max_background_refreshes=settings.cache_max_background_refreshes,
+        upstream=make_upstream_downloader(settings),
+    )
+    if settings.redis_url:
+        page_cache = RedisCache(
+            redis_url=settings.redis_url,
+            codec=page_codec,
+            key_prefix=settings.redis_key_prefix,
+            ttl=settings.cache_max_age,
+            max_connections=settings.redis_max_connections,
+            soft_ttl=settings.cache_soft_ttl,
+            max_background_refreshes=settings.cache_max_background_refreshes,
+            upstream=page_cache,
+        )
+    if settings.cache_pack_file:
+        page_cache = PackCache(
+            pack_file=settings.cache_pack_file, codec=page_codec, upstream=page_cache
+        )
+    return MemoryCache(
+        upstream=SingleFlightDownloader(upstream=page_cache),
+        max_bytes=settings.memory_cache_max_bytes,
+    )
+
+
+def make_upstream_downloader(settings: Settings) -> IDownloader:
+    """Return the downloader sending requests to linguee.com."""
+    egress_routes = [
+        # Don't leak proxy credentials to logs
+        EgressRoute(
+            f"proxy {urlsplit(proxy).hostname}",
+            make_http_downloader(settings, proxy=proxy),
+        )
+        for proxy in settings.egress_proxies
+    ] + [
+        EgressRoute(
+            f"local {address}",
+            make_http_downloader(settings, local_address=address),
+        )
+        for address in settings.egress_local_addresses
+    ]
+    downloader = (
+        EgressPoolDownloader(egress_routes, ejection_time=settings.egress_ejection_time)
+        if egress_routes
+        else make_http_downloader(settings)
+    )
+    downloader = RetryingDownloader(
+        upstream=downloader,
+        max_attempts=settings.upstream_max_attempts,
+        backoff=settings.upstream_retry_backoff,
+        max_backoff=settings.upstream_retry_max_backoff,
+        deadline=settings.upstream_deadline,
+        hedge=settings.upstream_hedge,
+        hedge_delay=settings.upstream_hedge_delay,
+    )
+    return CircuitBreakerDownloader(
+        upstream=downloader,
+        failure_threshold=settings.circuit_breaker_failure_threshold,
+        reset_timeout=settings.circuit_breaker_reset_timeout,
+    )
+
+
+def make_http_downloader(
+    settings: Settings,
+    *,
+    proxy: Optional[str] = None,
+    local_address: Optional[str] = None,
+) -> IDownloader:
+    downloader: IDownloader = HTTPXDownloader(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry,
+        connect_timeout=settings.http_connect_timeout,
+        read_timeout=settings.http_read_timeout,
+        pool_timeout=settings.http_pool_timeout,
+        http2=settings.http2,
+        proxy=proxy,
+        local_address=local_address,
+    )
+    if settings.upstream_rate_limit:
+        downloader = RateLimitedDownloader(
+            upstream=downloader,
+            rate=settings.upstream_rate_limit,
+            burst=settings.upstream_burst,
+            max_delay=settings.upstream_max_delay,
+        )
+    return downloader
+
+
+def make_result_cache(settings: Settings, page_codec: PageCodec) -> Optional[ICache]:
+    if not settings.result_cache:
+        return None
+    return SQLiteCache(
+        cache_database=settings.result_cache_database,
+        codec=page_codec,
+        mmap_size=settings.sqlite_mmap_size,
+        cache_size=settings.sqlite_cache_size,
+        write_behind=settings.sqlite_write_behind,
+        write_batch_size=settings.sqlite_write_batch_size,
+        write_flush_interval=settings.sqlite_write_flush_interval,
+        write_queue_size=settings.sqlite_write_queue_size,
+        max_age=settings.cache_max_age,
+        max_size=settings.result_cache_max_size,
+        cleanup_interval=settings.cache_cleanup_interval,
+        soft_ttl=settings.cache_soft_ttl,
+        upstream=ErrorDownloader(),
+    )
+
+
+def make_negative_cache(settings: Settings) -> Optional[NegativeCache]:
+    if not settings.negative_cache:
+        return None
+    return NegativeCache(
+        not_found_ttl=settings.negative_cache_not_found_ttl,
+        error_ttl=settings.negative_cache_error_ttl,
+        max_size=settings.negative_cache_max_size,
+    )
+
+
+def make_page_parser(settings: Settings) -> IParser:
+    if settings.parse_profiling:
+        parse_profiler.enable()
+    return import_string(settings.parser)()
+
+
+def make_parser_pool(settings: Settings, page_parser: IParser) -> Optional[ParserPool]:
+    if not settings.parser_pool:
+        return None
+    if settings.parse_profiling:
+        # Stats of the pages, parsed in the worker processes, never reach the API
+        raise ValueError("PARSE_PROFILING doesn't work with PARSER_POOL")
+    return ParserPool(
+        page_parser,
+        max_workers=settings.parser_pool_size,
+        inline_threshold=settings.parser_pool_inline_threshold,
+    )
@@ -1,11 +1,15 @@
-from typing import Union
+import functools
+import json
+import time
+from typing import AbstractSet, Optional, Union
 from urllib.parse import urlencode
 
 from loguru import logger
 
 from linguee_api.const import LANGUAGE_CODE, LANGUAGES, MAX_REDIRECTS
-from linguee_api.downloaders.interfaces import DownloaderError, IDownloader
+from linguee_api.downloaders.interfaces import DownloaderError, ICache, IDownloader
 from linguee_api.models import (
+    ALL_SECTIONS,
     Autocompletions,
     AutocompletionsOrError,
     Correction,
@@ -13,24 +17,68 @@ from linguee_api.models import (
     NotFound,
     ParseError,
     SearchResult,
+    SearchResultOrError,
+    SearchResultSection,
+    construct_trusted,
 )
+from linguee_api.negative_cache import NegativeCache
+from linguee_api.parser_pool import ParserPool
 from linguee_api.parsers import IParser
 
+# The message of the ParseError, returned for queries that Linguee has no
+# translation for
+NOT_FOUND_MESSAGE = "Translation not found"
+
 
 class LingueeClient:
-    """Linguee client. The core class of the application."""
+    """Linguee client. The core class of the application.
+
+    If the result cache is provided, successfully parsed results are stored there,
+    serialized to JSON, and keyed by the request parameters and the parser
+    version. A hit in the result cache skips downloading and parsing pages, and
+    following corrections.
+
+    If the negative cache is provided, pages that turned out to be not found, and
+    pages that failed to download, are remembered there for a short time, and
+    requests for them fail without going to the downloader.
+
+    If the parser pool is provided, pages are parsed there, off the event loop,
+    rather than by the page parser directly. The pool must run the same parser.
+    """
 
     def __init__(
         self,
         *,
         page_downloader: IDownloader,
         page_parser: IParser,
+        result_cache: Optional[ICache] = None,
+        negative_cache: Optional[NegativeCache] = None,
+        parser_pool: Optional[ParserPool] = None,
         max_redirects=MAX_REDIRECTS,
     ):
         self.page_downloader = page_downloader
         self.page_parser = page_parser
+        self.result_cache = result_cache
+        self.negative_cache = negative_cache
+        self.parser_pool = parser_pool
         self.max_redirects = max_redirects
 
+    async def open(self) -> None:
+        """Open the downloader chain, the result cache and the parser pool."""
+        await self.page_downloader.open()
+        if self.result_cache is not None:
+            await self.result_cache.open()
+        if self.parser_pool is not None:
+            await self.parser_pool.open()
+
+    async def close(self) -> None:
+        """Close the downloader chain, the result cache and the parser pool."""
+        await self.page_downloader.close()
+        if self.result_cache is not None:
+            await self.result_cache.close()
+        if self.parser_pool is not None:
+            await self.parser_pool.close()
+
     async def process_search_result(
         self,
         *,
@@ -39,11 +87,59 @@ class LingueeClient:
         dst: LANGUAGE_CODE,
         guess_direction: bool,
         follow_corrections: FollowCorrections,
+        sections: AbstractSet[SearchResultSection] = ALL_SECTIONS,
     ) -> Union[SearchResult, ParseError]:
+        """Return the search result.
+
+        Only the given sections of the result are parsed, and the rest are empty.
+        """
         logger.info(
             f"Processing API request: {query=}, {src=}, {dst=}, "
-            f"{guess_direction=}, {follow_corrections=}"
+            f"{guess_direction=}, {follow_corrections=}, {sections=}"
+        )
+        get_result_key_for_sections = functools.partial(
+            get_search_result_key,
+            query=query,
+            src=src,
+            dst=dst,
+            guess_direction=guess_direction,
+            follow_corrections=follow_corrections,
+            parser_version=self.page_parser.version,
         )
+        result_key = get_result_key_for_sections(sections=sections)
+        cached_result = await self._get_cached_result(result_key)
+        if cached_result is None and sections != ALL_SECTIONS:
+            # The full result, for example, from the cache warm-up, has all the
+            # sections too.
+            cached_result = await self._get_cached_result(
+                get_result_key_for_sections(sections=ALL_SECTIONS)
+            )
+        if cached_result is not None:
+            logger.info("Returning search result from the result cache")
+            return construct_trusted(SearchResult, cached_result)
+
+        result = await self._process_search_result(
+            query=query,
+            src=src,
+            dst=dst,
+            guess_direction=guess_direction,
+            follow_corrections=follow_corrections,
+            sections=sections,
+        )
+        if isinstance(result, SearchResult):
+            await self._put_cached_result(result_key, result.json())
+        return result
+
+    async def _process_search_result(
+        self,
+        *,
+        query: str,
+        src: LANGUAGE_CODE,
+        dst: LANGUAGE_CODE,
+        guess_direction: bool,
+        follow_corrections: FollowCorrections,
+        sections: AbstractSet[SearchResultSection],
+    ) -> Union[SearchResult, ParseError]:
         url = get_search_url(
             query=query,
             src=src,
@@ -52,14 +148,21 @@ class LingueeClient:
         )
 
         for i in range(self.max_redirects):
+            failure_key = get_result_key(url, self.page_parser.version)
+            failure = self._get_cached_failure(failure_key)
+            if failure is not None:
+                logger.info(f"Returning error from the negative cache: {failure=}")
+                return ParseError(message=failure)
+
             try:
                 page_html = await self.page_downloader.download(url)
             except DownloaderError as error:
                 logger.error(f"Error downloading URL: {error=}, {url=}")
+                self._put_cached_error(failure_key, str(error))
                 return ParseError(message=str(error))
 
-            parse_result = self.page_parser.parse_search_result(
-                page_html, follow_corrections=follow_corrections
+            parse_result = await self._parse_search_result(
+                page_html, follow_corrections, sections
             )
             if isinstance(parse_result, ParseError):
                 logger.info(f"Parser returned parse error: {parse_result=}")
@@ -83,7 +186,16 @@ class LingueeClient:
                 return parse_result
             elif isinstance(parse_result, NotFound):
                 logger.info("Parser returned not found")
-                return ParseError(message="Translation not found")
+                not_found = NOT_FOUND_MESSAGE
+                # Without following corrections, a page with a correction is
+                # also not found, but it's not for the other modes. With them,
+                # the page has no correction, and it's not found for any mode.
+                if (
+                    self.negative_cache is not None
+                    and follow_corrections != FollowCorrections.NEVER
+                ):
+                    self.negative_cache.put_not_found(failure_key, not_found)
+                return ParseError(message=not_found)
             else:
                 logger.error(f"Unexpected API result: {parse_result=}")
                 raise RuntimeError(f"Unexpected API result: {parse_result}")
@@ -104,19 +216,80 @@ class LingueeClient:
             src=src_lang_code,
             dst=dst_lang_code,
         )
+        result_key = get_result_key(url, self.page_parser.version)
+        cached_result = await self._get_cached_result(result_key)
+        if cached_result is not None:
+            return construct_trusted(Autocompletions, cached_result)
+
+        failure = self._get_cached_failure(result_key)
+        if failure is not None:
+            return ParseError(message=failure)
+
         try:
             page_html = await self.page_downloader.download(url)
         except DownloaderError as error:
+            self._put_cached_error(result_key, str(error))
             return ParseError(message=str(error))
 
-        parse_result = self.page_parser.parse_autocompletions(page_html)
+        parse_result = await self._parse_autocompletions(page_html)
         if isinstance(parse_result, ParseError):
             return parse_result
         elif isinstance(parse_result, Autocompletions):
+            await self._put_cached_result(result_key, parse_result.json())
             return parse_result
 
         raise RuntimeError(f"Unexpected API result: {parse_result}")
 
+    async def _parse_search_result(
+        self,
+        page_html: str,
+        follow_corrections: FollowCorrections,
+        sections: AbstractSet[SearchResultSection],
+    ) -> SearchResultOrError:
+        if self.parser_pool is not None:
+            return await self.parser_pool.parse_search_result(
+                page_html, follow_corrections, sections
+            )
+        return self.page_parser.parse_search_result(
+            page_html, follow_corrections=follow_corrections, sections=sections
+        )
+
+    async def _parse_autocompletions(self, page_html: str) -> AutocompletionsOrError:
+        if self.parser_pool is not None:
+            return await self.parser_pool.parse_autocompletions(page_html)
+        return self.page_parser.parse_autocompletions(page_html)
+
+    async def _get_cached_result(self, result_key: str) -> Optional[dict]:
+        if self.result_cache is None:
+            return None
+        entry = await self.result_cache.get_cache_entry(result_key)
+        if entry is None:
+            return None
+        # Results older than the soft TTL are processed again. The page cache
+        # serves or refreshes the page according to its own stale-while-revalidate
+        # policy.
+        soft_ttl = self.result_cache.soft_ttl
+        if (
+            soft_ttl is not None
+            and entry.created_at is not None
+            and time.time() - entry.created_at > soft_ttl
+        ):
+            return None
+        return json.loads(entry.page)
+
+    def _get_cached_failure(self, failure_key: str) -> Optional[str]:
+        if self.negative_cache is None:
+            return None
+        return self.negative_cache.get(failure_key)
+
+    def _put_cached_error(self, failure_key: str, message: str) -> None:
+        if self.negative_cache is not None:
+            self.negative_cache.put_error(failure_key, message)
+
+    async def _put_cached_result(self, result_key: str, result_json: str) -> None:
+        if self.result_cache is not None:
+            await self.result_cache.put_to_cache(result_key, result_json)
+
 
 def get_search_url(
     *,
@@ -140,6 +313,30 @@ def get_search_url(
     return f"{url}?{urlencode(query_params)}"
 
 
+def get_search_result_key(
+    *,
+    query: str,
+    src: LANGUAGE_CODE,
+    dst: LANGUAGE_CODE,
+    guess_direction: bool,
+    follow_corrections: FollowCorrections,
+    parser_version: str,
+    sections: AbstractSet[SearchResultSection] = ALL_SECTIONS,
+):
+    """Return a result cache key for the search result."""
+    url = get_search_url(query=query, src=src, dst=dst, guess_direction=guess_direction)
+    params = {"follow_corrections": follow_corrections.value}
+    if sections != ALL_SECTIONS:
+        params["sections"] = ",".join(sorted(section.value for section in sections))
+    url += "&" + urlencode(params)
+    return get_result_key(url, parser_version)
+
+
+def get_result_key(url: str, parser_version: str):
+    """Return a result cache key for the URL of the first page of the result."""
+    return f"parser-v{parser_version}:{url}"
+
+
 def get_autocompletions_url(
     *,
     query: str,
@@ -0,0 +1,280 @@
+"""
+Parser built directly on lxml.
+
+LxmlParser returns the same results as XExtractParser, but instead of walking
+generic xextract schemas, it runs XPath expressions, compiled once on import, and
+builds the result dicts by hand. The CSS selectors are the ones of the xextract
+schemas, translated to XPath the same way xextract does. The callbacks are
+shared with the xextract schemas, too.
+"""
+from typing import AbstractSet, Any, Dict, List, Optional
+
+from cssselect import GenericTranslator
+from lxml import etree
+from xextract.parsers import ParsingError
+
+from linguee_api import autocompletions_parser
+from linguee_api.models import (
+    ALL_SECTIONS,
+    AutocompletionsOrError,
+    Correction,
+    FollowCorrections,
+    NotFound,
+    SearchResult,
+    SearchResultOrError,
+    SearchResultSection,
+)
+from linguee_api.parser_utils import (
+    concat_texts,
+    get_element_text,
+    normalize,
+    parse_tree,
+    require_root,
+)
+from linguee_api.parsers import (
+    IParser,
+    classify_page,
+    is_featured,
+    normalize_example,
+    normalize_source_url,
+    parse_audio_links,
+    parse_usage_frequency,
+)
+
+_css_translator = GenericTranslator()
+
+
+def css(selector: str) -> etree.XPath:
+    """Compile the CSS selector, the same way xextract does."""
+    return etree.XPath(_css_translator.css_to_xpath(selector))
+
+
+# Not found and correction
+NOT_FOUND = css("h1.noresults")
+CORRECTION = css("span.corrected")
+
+# Search result
+DATA = css("div#data")
+LEMMAS = css("div.exact > div.lemma")
+EXAMPLES = css("div.example_lines div.lemma")
+EXTERNAL_SOURCES = css("table.result_table > tbody > tr")
+
+# Lemma
+LEMMA_TEXT = css("span.tag_lemma")
+LEMMA_TEXT_ITEM = css("a.dictLink")
+LEMMA_POS = css("span.tag_lemma > span.tag_wordtype, span.tag_lemma > span.tag_type")
+LEMMA_FORMS = css("span.tag_forms")
+LEMMA_GRAMMAR_INFO = css(
+    "span.tag_lemma > span.tag_lemma_context > span.placeholder > span.grammar_info"
+)
+LEMMA_AUDIO_LINKS = css("span.tag_lemma > a.audio")
+LEMMA_TRANSLATIONS = css("div.translation_lines div.translation")
+
+# Lemma translation
+TRANSLATION_TEXT = css("a.dictLink")
+TRANSLATION_POS = css("span.tag_type")
+TRANSLATION_AUDIO_LINKS = css("a.audio")
+TRANSLATION_USAGE_FREQUENCY = css("span.tag_c")
+TRANSLATION_EXAMPLES = css(".example_lines > .example")
+TRANSLATION_EXAMPLE_SRC = css(".tag_s")
+TRANSLATION_EXAMPLE_DST = css(".tag_t")
+
+# External source
+EXTERNAL_SOURCE_SRC = css("td.left > div.wrap")
+EXTERNAL_SOURCE_DST = css("td.right2 > div.wrap")
+EXTERNAL_SOURCE_SRC_CELL = css("td.left")
+EXTERNAL_SOURCE_DST_CELL = css("td.right2")
+SOURCE_URL_LINK = css("div.source_url > a")
+SOURCE_URL_TEXT = css("div.source_url")
+
+
+class LxmlParser(IParser):
+    def parse_search_result(
+        self,
+        page_html: str,
+        follow_corrections: FollowCorrections,
+        sections: AbstractSet[SearchResultSection] = ALL_SECTIONS,
+    ) -> SearchResultOrError:
+        # find correction, if asked. We'll use it on not found or empty response.
+        # Correction and not found pages are classified without building the
+        # tree.
+        page_class = classify_page(
+            page_html,
+            find_correction=follow_corrections
+            in (FollowCorrections.ALWAYS, FollowCorrections.ON_EMPTY_TRANSLATIONS),
+            stop_at_correction=follow_corrections == FollowCorrections.ALWAYS,
+        )
+        correction = page_class.correction
+
+        # check if the page is correction
+        if correction and follow_corrections == FollowCorrections.ALWAYS:
+            return Correction(correction=correction)
+
+        # check if the page is a not found
+        if page_class.is_not_found:
+            if correction:
+                return Correction(correction=correction)
+            return NotFound()
+
+        # assume it's a valid result. Lemmas are needed to decide on the
+        # correction, even if they are not asked for.
+        if correction:
+            sections = sections | {SearchResultSection.LEMMAS}
+        result = self.parse_search_result_to_page(parse_tree(page_html), sections)
+
+        # Process ON_EMTPY case
+        if correction and not result.lemmas:
+            return Correction(correction=correction)
+
+        return result
+
+    def is_not_found(self, root: Optional[etree._Element]) -> bool:
+        """Return True if the page is a NOT FOUND page."""
+        return root is not None and bool(NOT_FOUND(root))
+
+    def find_correction(self, root: Optional[etree._Element]) -> Optional[str]:
+        """Find the correction for a NOT FOUND page."""
+        if root is None:
+            return None
+        corrections = CORRECTION(root)
+        if corrections:
+            return get_element_text(corrections[0])
+        return None
+
+    def parse_search_result_to_page(
+        self,
+        root: Optional[etree._Element],
+        sections: AbstractSet[SearchResultSection] = ALL_SECTIONS,
+    ) -> SearchResult:
+        parsed_result = self.parse_search_result_to_dict(root, sections)
+        return SearchResult(**parsed_result)
+
+    def parse_search_result_to_dict(
+        self,
+        root: Optional[etree._Element],
+        sections: AbstractSet[SearchResultSection] = ALL_SECTIONS,
+    ) -> dict:
+        root = require_root(root)
+        data = one(DATA(root), "src_lang")
+        parsed_result: Dict[str, Any] = {
+            "src_lang": data.get("data-lang1", ""),
+            "dst_lang": data.get("data-lang2", ""),
+            "query": data.get("data-query", ""),
+            "correct_query": data.get("data-correctspellingofquery", ""),
+            "lemmas": [],
+            "examples": [],
+            "external_sources": [],
+        }
+        if SearchResultSection.LEMMAS in sections:
+            parsed_result["lemmas"] = [parse_lemma(node) for node in LEMMAS(root)]
+        if SearchResultSection.EXAMPLES in sections:
+            parsed_result["examples"] = [parse_lemma(node) for node in EXAMPLES(root)]
+        if SearchResultSection.EXTERNAL_SOURCES in sections:
+            parsed_result["external_sources"] = [
+                parse_external_source(node) for node in EXTERNAL_SOURCES(root)
+            ]
+        return parsed_result
+
+    def parse_autocompletions(self, page_html: str) -> AutocompletionsOrError:
+        return autocompletions_parser.parse_autocompletions(page_html)
+
+    def parse_autocompletions_to_dict(self, root: Optional[etree._Element]) -> dict:
+        return autocompletions_parser.parse_autocompletions_to_dict(root)
+
+
+def get_all_text(node: etree._Element) -> str:
+    """Return the text of the node and all its descendants."""
+    return "".join(node.itertext())
+
+
+def one(nodes: List[etree._Element], name: str) -> etree._Element:
+    if len(nodes) != 1:
+        raise ParsingError(f'"{name}" matched {len(nodes)} elements ("1" expected).')
+    return nodes[0]
+
+
+def optional(nodes: List[etree._Element], name: str) -> Optional[etree._Element]:
+    if len(nodes) > 1:
+        raise ParsingError(f'"{name}" matched {len(nodes)} elements ("?" expected).')
+    return nodes[0] if nodes else None
+
+
+def some(nodes: List[etree._Element], name: str) -> List[etree._Element]:
+    if not nodes:
+        raise ParsingError(f'"{name}" matched 0 elements ("+" expected).')
+    return nodes
+
+
+def get_audio_links(nodes: List[etree._Element]) -> Optional[List[Dict[str, str]]]:
+    node = optional(nodes, "audio_links")
+    if node is None:
+        return None
+    return parse_audio_links(node.get("onclick", ""))
+
+
+def parse_lemma(node: etree._Element) -> dict:
+    text_node = one(LEMMA_TEXT(node), "text")
+    grammar_info = LEMMA_GRAMMAR_INFO(node)
+    return {
+        "featured": is_featured(node.get("class", "")),
+        "text": " ".join(
+            normalize(get_element_text(item))
+            for item in some(LEMMA_TEXT_ITEM(text_node), "item")
+        ),
+        "pos": concat_texts([get_element_text(pos) for pos in LEMMA_POS(node)]),
+        "forms": concat_texts([get_all_text(forms) for forms in LEMMA_FORMS(node)]),
+        "grammar_info": normalize(get_element_text(grammar_info[0]))
+        if grammar_info
+        else None,
+        "audio_links": get_audio_links(LEMMA_AUDIO_LINKS(node)),
+        "translations": [
+            parse_translation(translation)
+            for translation in some(LEMMA_TRANSLATIONS(node), "translations")
+        ],
+    }
+
+
+def parse_translation(node: etree._Element) -> dict:
+    usage_frequency = None
+    for item in TRANSLATION_USAGE_FREQUENCY(node):
+        usage_frequency = parse_usage_frequency(item.get("class", ""))
+        if usage_frequency:
+            break
+    return {
+        "featured": is_featured(node.get("class", "")),
+        "text": normalize(get_element_text(one(TRANSLATION_TEXT(node), "text"))),
+        "pos": concat_texts([pos.get("title", "") for pos in TRANSLATION_POS(node)]),
+        "audio_links": get_audio_links(TRANSLATION_AUDIO_LINKS(node)),
+        "usage_frequency": usage_frequency,
+        "examples": [
+            {
+                "src": normalize(
+                    get_element_text(one(TRANSLATION_EXAMPLE_SRC(example), "src"))
+                ),
+                "dst": normalize(
+                    get_element_text(one(TRANSLATION_EXAMPLE_DST(example), "dst"))
+                ),
+            }
+            for example in TRANSLATION_EXAMPLES(node)
+        ],
+    }
+
+
+def parse_external_source(node: etree._Element) -> dict:
+    return {
+        "src": normalize_example(get_all_text(one(EXTERNAL_SOURCE_SRC(node), "src"))),
+        "dst": normalize_example(get_all_text(one(EXTERNAL_SOURCE_DST(node), "dst"))),
+        "src_url": parse_source_url(one(EXTERNAL_SOURCE_SRC_CELL(node), "src_url")),
+        "dst_url": parse_source_url(one(EXTERNAL_SOURCE_DST_CELL(node), "dst_url")),
+    }
+
+
+def parse_source_url(node: etree._Element) -> Optional[str]:
+    link = optional(SOURCE_URL_LINK(node), "src_url")
+    text = optional(SOURCE_URL_TEXT(node), "src_url_text")
+    return normalize_source_url(
+        {
+            "src_url": None if link is None else link.get("href", ""),
+            "src_url_text": None if text is None else get_element_text(text),
+        }
+    )
@@ -1,8 +1,9 @@
 """Data classes that define the schema of the API response."""
 from enum import Enum
-from typing import List, Optional, Union
+from typing import Any, List, Optional, Type, TypeVar, Union
 
 from pydantic import BaseModel, Field, validator
+from pydantic.fields import SHAPE_LIST, ModelField
 
 from linguee_api.parser_utils import remove_round_brackets_and_split_by_commas
 
@@ -13,6 +14,17 @@ class FollowCorrections(Enum):
     ON_EMPTY_TRANSLATIONS = "on_empty_translations"
 
 
+class SearchResultSection(Enum):
+    """A part of the search result that can be parsed on its own."""
+
+    LEMMAS = "lemmas"
+    EXAMPLES = "examples"
+    EXTERNAL_SOURCES = "external_sources"
+
+
+ALL_SECTIONS = frozenset(SearchResultSection)
+
+
 class AudioLink(BaseModel):
     """The link to the audio file along with the language variant."""
 
@@ -166,3 +178,35 @@ class ParseError(BaseModel):
 
 SearchResultOrError = Union[SearchResult, ParseError, Correction, NotFound]
 AutocompletionsOrError = Union[Autocompletions, ParseError]
+
+
+ModelType = TypeVar("ModelType", bound=BaseModel)
+
+
+def construct_trusted(model: Type[ModelType], data: dict) -> ModelType:
+    """
+    Create a model from trusted data, skipping validation.
+
+    Unlike model.construct(), creates nested models and enums as well. Only use it
+    for data that was validated by the same model before, for example, for a
+    serialized model, or for the output of a parser.
+    """
+    values = {
+        name: _construct_trusted_value(field, data[field.alias])
+        for name, field in model.__fields__.items()
+        if field.alias in data
+    }
+    return model.construct(**values)
+
+
+def _construct_trusted_value(field: ModelField, value: Any) -> Any:
+    if value is None:
+        return None
+    type_ = field.type_
+    if isinstance(type_, type) and issubclass(type_, BaseModel):
+        if field.shape == SHAPE_LIST:
+            return [construct_trusted(type_, item) for item in value]
+        return construct_trusted(type_, value)
+    if isinstance(type_, type) and issubclass(type_, Enum):
+        return type_(value)
+    return value
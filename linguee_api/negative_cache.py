@@ -0,0 +1,60 @@
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class NegativeCache:
+    """In-memory cache of recent failures.
+
+    Remembers pages that Linguee reported as not found for not_found_ttl seconds,
+    and download errors (including 503 blocks) for error_ttl seconds, so that
+    repeated requests for the same nonsense query, or retries during a block,
+    don't go to Linguee again. Keeps at most max_size entries, the oldest ones
+    are dropped first.
+
+    Hits and misses are counted separately from the page and result caches.
+    """
+
+    def __init__(
+        self,
+        *,
+        not_found_ttl: float = 300.0,
+        error_ttl: float = 10.0,
+        max_size: int = 10000,
+    ):
+        self.not_found_ttl = not_found_ttl
+        self.error_ttl = error_ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        # Key -> (error message, expiration time)
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the error message of a recent failure, or None."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            message, expires_at = entry
+            if time.monotonic() < expires_at:
+                self.hits += 1
+                return message
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put_not_found(self, key: str, message: str) -> None:
+        self._put(key, message, self.not_found_ttl)
+
+    def put_error(self, key: str, message: str) -> None:
+        self._put(key, message, self.error_ttl)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _put(self, key: str, message: str, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        self._entries.pop(key, None)
+        self._entries[key] = (message, time.monotonic() + ttl)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
@@ -0,0 +1,194 @@
+"""
+Per-field profiling of the page parsers.
+
+When enabled, the parsing functions, called by both XExtractParser and
+LxmlParser, record how many times they ran and how long they took, children
+included:
+
+- parse_search_result() of both parsers, under "search_result",
+  - page classification, under "classify", and building the document, under
+    "document",
+  - every parser of the xextract search result schema, with the number of
+    elements its selector matched, for example, "lemmas/translations/text",
+  - the LxmlParser functions, parsing lemmas, translations and external
+    sources, under "lemma", "translation" and "external_source",
+- the autocompletion fast path, under "autocompletions", with "document",
+  "item" and "item/translation" inside.
+
+Callbacks of the schemas, such as normalize() or parse_audio_links(), are timed
+separately. Stats are keyed by the path of the field, for example,
+"search_result/lemmas/translations/text", and aggregated across requests until
+reset.
+
+Profiling works by wrapping the functions, methods and schema objects in place,
+so when it's disabled, parsers run exactly as without it. Only pages, parsed in
+this process, are profiled, so profiling doesn't work with the parser pool.
+"""
+import json
+import pathlib
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from xextract.parsers import BaseParser
+
+from linguee_api import autocompletions_parser, lxml_parser, parsers
+
+# (owner, attribute, label) of the functions and methods to profile
+PROFILED_FUNCTIONS: List[Tuple[Any, str, str]] = [
+    (parsers.XExtractParser, "parse_search_result", "search_result"),
+    (parsers, "classify_page", "classify"),
+    (parsers, "parse_document", "document"),
+    (lxml_parser.LxmlParser, "parse_search_result", "search_result"),
+    (lxml_parser, "classify_page", "classify"),
+    (lxml_parser, "parse_tree", "document"),
+    (lxml_parser, "parse_lemma", "lemma"),
+    (lxml_parser, "parse_translation", "translation"),
+    (lxml_parser, "parse_external_source", "external_source"),
+    (autocompletions_parser, "parse_autocompletions", "autocompletions"),
+    (autocompletions_parser, "parse_tree", "document"),
+    (autocompletions_parser, "parse_autocompletion", "item"),
+    (autocompletions_parser, "parse_autocompletion_translation", "translation"),
+]
+
+
+class FieldStats:
+    """Stats of one field or callback."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.matches = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def add(self, elapsed: float, matches: int = 0) -> None:
+        self.calls += 1
+        self.matches += matches
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "matches": self.matches,
+            "total_ms": self.total_time * 1e3,
+            "mean_us": self.total_time / self.calls * 1e6 if self.calls else 0.0,
+            "max_us": self.max_time * 1e6,
+        }
+
+
+class ParseProfiler:
+    """Profiler of the page parsers. Use the parse_profiler instance."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._stats: Dict[str, FieldStats] = {}
+        self._path: List[str] = []
+        # Wrapped functions and methods with the originals, to restore on disable()
+        self._wrapped_functions: List[Tuple[Any, str, Callable]] = []
+        # Wrapped parsers with their original callbacks, to restore on disable()
+        self._instrumented: List[Tuple[BaseParser, Optional[Callable]]] = []
+
+    def enable(self) -> None:
+        """Instrument the parsers. Safe to call more than once."""
+        if self.enabled:
+            return
+        self.enabled = True
+        for owner, attribute, label in PROFILED_FUNCTIONS:
+            original = vars(owner)[attribute]
+            setattr(owner, attribute, self._wrap_function(original, label))
+            self._wrapped_functions.append((owner, attribute, original))
+        for schema in [
+            *parsers.search_result_header_schema,
+            *parsers.search_result_section_schemas.values(),
+        ]:
+            self._instrument(schema, schema.name)
+
+    def disable(self) -> None:
+        """Restore the parsers. Collected stats are kept."""
+        for owner, attribute, original in self._wrapped_functions:
+            setattr(owner, attribute, original)
+        self._wrapped_functions.clear()
+        for schema, callback in self._instrumented:
+            del schema._parse
+            if callback is not None:
+                schema.callback = callback  # type: ignore
+        self._instrumented.clear()
+        self.enabled = False
+
+    def reset(self) -> None:
+        self._stats.clear()
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return the stats by field path, the slowest fields first."""
+        items = sorted(self._stats.items(), key=lambda item: -item[1].total_time)
+        return {path: stats.to_dict() for path, stats in items}
+
+    def dump(self, dump_file: pathlib.Path) -> None:
+        """Write the stats to the file as JSON."""
+        dump_file.parent.mkdir(parents=True, exist_ok=True)
+        dump_file.write_text(json.dumps(self.get_stats(), indent=2) + "\n")
+
+    def _wrap_function(self, func: Callable, label: str) -> Callable:
+        def timed_function(*args, **kwargs):
+            self._path.append(label)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._get_stats().add(time.perf_counter() - started)
+                self._path.pop()
+
+        return timed_function
+
+    def _instrument(self, schema: BaseParser, label: str) -> None:
+        if "_parse" in schema.__dict__:
+            # Shared by more than one schema, and already instrumented
+            return
+        schema._parse = self._wrap_parse(schema, label)  # type: ignore
+        callback = getattr(schema, "callback", None)
+        if callback is not None:
+            schema.callback = self._wrap_callback(callback)  # type: ignore
+        self._instrumented.append((schema, callback))
+        # xextract requires names for all the children
+        for child in getattr(schema, "children", None) or []:
+            self._instrument(child, child.name)
+
+    def _wrap_parse(self, schema: BaseParser, label: str) -> Callable:
+        # The same as BaseParser._parse(), but timed
+        def _parse(extractor, context):
+            self._path.append(label)
+            started = time.perf_counter()
+            nodes = []
+            try:
+                nodes = extractor.select(schema.compiled_xpath)
+                return schema._process_nodes(nodes, context)
+            finally:
+                elapsed = time.perf_counter() - started
+                self._get_stats().add(elapsed, matches=len(nodes))
+                self._path.pop()
+
+        return _parse
+
+    def _wrap_callback(self, callback: Callable) -> Callable:
+        callback_name = callback.__name__.strip("_")
+
+        def timed_callback(value):
+            started = time.perf_counter()
+            try:
+                return callback(value)
+            finally:
+                self._get_stats(callback_name).add(time.perf_counter() - started)
+
+        return timed_callback
+
+    def _get_stats(self, callback_name: Optional[str] = None) -> FieldStats:
+        path = "/".join(self._path)
+        if callback_name:
+            path += f" [{callback_name}]"
+        stats = self._stats.get(path)
+        if stats is None:
+            stats = self._stats[path] = FieldStats()
+        return stats
+
+
+parse_profiler = ParseProfiler()
@@ -0,0 +1,147 @@
+"""
+Parsing off the event loop.
+
+Parsing a search result page takes tens of milliseconds of CPU time. Done in the
+event loop, it stalls every other request of the process, cache hits included.
+ParserPool runs the parser in a pool of worker processes instead. Only the page
+HTML goes to a worker, and only the plain dict of the result comes back. The
+result was validated by the worker, so it's rebuilt without validation.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AbstractSet, Dict, Optional, Tuple, Type, cast
+
+from loguru import logger
+from pydantic import BaseModel
+
+from linguee_api.models import (
+    ALL_SECTIONS,
+    Autocompletions,
+    AutocompletionsOrError,
+    Correction,
+    FollowCorrections,
+    NotFound,
+    ParseError,
+    SearchResult,
+    SearchResultOrError,
+    SearchResultSection,
+    construct_trusted,
+)
+from linguee_api.parsers import IParser
+
+RESULT_MODELS: Dict[str, Type[BaseModel]] = {
+    model.__name__: model
+    for model in (SearchResult, Autocompletions, Correction, NotFound, ParseError)
+}
+
+# The parser of the worker process, set by the pool initializer.
+_worker_parser: Optional[IParser] = None
+
+
+class ParserPool:
+    """Run the parser in a pool of worker processes.
+
+    Pages shorter than inline_threshold characters, such as autocompletions, are
+    parsed in the event loop, as sending them to a worker costs more than parsing.
+
+    The pool is started on open() and shut down on close(). Workers are spawned,
+    rather than forked, so that they don't inherit the event loop, connections
+    and threads of the server. If a worker dies, the pool is restarted, and the
+    page is parsed in the event loop.
+    """
+
+    def __init__(
+        self,
+        parser: IParser,
+        *,
+        max_workers: Optional[int] = None,
+        inline_threshold: int = 16 * 1024,
+    ):
+        self.parser = parser
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.inline_threshold = inline_threshold
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    async def open(self) -> None:
+        self._get_executor()
+
+    async def close(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+
+    async def parse_search_result(
+        self,
+        page_html: str,
+        follow_corrections: FollowCorrections,
+        sections: AbstractSet[SearchResultSection] = ALL_SECTIONS,
+    ) -> SearchResultOrError:
+        if len(page_html) < self.inline_threshold:
+            return self.parser.parse_search_result(
+                page_html, follow_corrections, sections
+            )
+        result = await self._run_in_worker(
+            _parse_search_result, page_html, follow_corrections, frozenset(sections)
+        )
+        if result is None:
+            return self.parser.parse_search_result(
+                page_html, follow_corrections, sections
+            )
+        return cast(SearchResultOrError, result)
+
+    async def parse_autocompletions(self, page_html: str) -> AutocompletionsOrError:
+        if len(page_html) < self.inline_threshold:
+            return self.parser.parse_autocompletions(page_html)
+        result = await self._run_in_worker(_parse_autocompletions, page_html)
+        if result is None:
+            return self.parser.parse_autocompletions(page_html)
+        return cast(AutocompletionsOrError, result)
+
+    async def _run_in_worker(self, func, *args) -> Optional[BaseModel]:
+        """Run the function in a worker. Return None if the worker died."""
+        executor = self._get_executor()
+        try:
+            model_name, data = await asyncio.get_running_loop().run_in_executor(
+                executor, func, *args
+            )
+        except BrokenProcessPool as e:
+            logger.error(f"Parser pool is broken, restarting: {e=}")
+            if self._executor is executor:
+                self._executor = None
+                executor.shutdown(wait=False)
+            return None
+        return construct_trusted(RESULT_MODELS[model_name], data)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.parser,),
+            )
+        return self._executor
+
+
+def _init_worker(parser: IParser) -> None:
+    global _worker_parser
+    _worker_parser = parser
+
+
+def _parse_search_result(
+    page_html: str,
+    follow_corrections: FollowCorrections,
+    sections: AbstractSet[SearchResultSection],
+) -> Tuple[str, dict]:
+    assert _worker_parser is not None
+    result = _worker_parser.parse_search_result(page_html, follow_corrections, sections)
+    return type(result).__name__, result.dict()
+
+
+def _parse_autocompletions(page_html: str) -> Tuple[str, dict]:
+    assert _worker_parser is not None
+    result = _worker_parser.parse_autocompletions(page_html)
+    return type(result).__name__, result.dict()
@@ -1,8 +1,9 @@
 import re
 from typing import Any, Dict, List, Optional
 
+from lxml import etree
 from xextract import Group
-from xextract.parsers import BaseNamedParser
+from xextract.parsers import BaseNamedParser, ParsingError
 
 
 def concat_values(name: str, *children: BaseNamedParser):
@@ -19,6 +20,11 @@ def concat_values(name: str, *children: BaseNamedParser):
     )
 
 
+def concat_texts(texts: List[str]) -> str:
+    """Same as concat_values() for one child."""
+    return normalize(" ".join(texts))
+
+
 def _concat_values_callback(objects: Dict[str, Any]) -> str:
     ret = []
     for value in objects.values():
@@ -63,3 +69,33 @@ def take_first_non_empty_item(variants) -> Optional[str]:
         if item:
             return item
     return None
+
+
+def get_element_text(node: etree._Element) -> str:
+    """
+    Return the text of the element, without the text of its descendants.
+
+    Same as the "text()" XPath, that xextract String uses by default.
+    """
+    return (node.text or "") + "".join(child.tail or "" for child in node)
+
+
+def parse_tree(page_html: str) -> Optional[etree._Element]:
+    """Parse the page into a tree, the same way xextract does.
+
+    Return None if lxml can't make anything out of the page.
+    """
+    if "<?xml" in page_html[:128]:
+        parser = etree.XMLParser(recover=True, encoding="utf-8")
+        empty_page = '<?xml version="1.0" encoding="UTF-8"?>'
+    else:
+        parser = etree.HTMLParser(recover=True, encoding="utf-8")
+        empty_page = "<html/>"
+    body = page_html.strip() or empty_page
+    return etree.fromstring(body.encode("utf-8"), parser=parser)
+
+
+def require_root(root: Optional[etree._Element]) -> etree._Element:
+    if root is None:
+        raise ParsingError('Page matched 0 elements ("1" expected).')
+    return root
@@ -1,20 +1,30 @@
 import abc
-from typing import Dict, List, Optional
+import functools
+from typing import AbstractSet, Dict, FrozenSet, List, NamedTuple, Optional, Union
 
+from lxml import etree
 from xextract import Group, String
+from xextract.extractors import (
+    HtmlXPathExtractor,
+    XmlXPathExtractor,
+    XPathExtractor,
+)
 
+from linguee_api import autocompletions_parser
 from linguee_api.models import (
-    Autocompletions,
+    ALL_SECTIONS,
     AutocompletionsOrError,
     Correction,
     FollowCorrections,
     NotFound,
     SearchResult,
     SearchResultOrError,
+    SearchResultSection,
     UsageFrequency,
 )
 from linguee_api.parser_utils import (
     concat_values,
+    get_element_text,
     normalize,
     take_first_item,
     take_first_non_empty_item,
@@ -22,42 +32,133 @@ from linguee_api.parser_utils import (
 
 
 class IParser(abc.ABC):
+    # Bump the version when the parser output changes, to invalidate results,
+    # parsed and cached by the previous version.
+    version: str = "1"
+
     @abc.abstractmethod
     def parse_search_result(
-        self, page_html: str, follow_corrections: FollowCorrections
+        self,
+        page_html: str,
+        follow_corrections: FollowCorrections,
+        sections: AbstractSet[SearchResultSection] = ALL_SECTIONS,
     ) -> SearchResultOrError:
-        ...
+        """Parse the page. Sections that are not asked for are left empty."""
 
     @abc.abstractmethod
     def parse_autocompletions(self, page_html: str) -> AutocompletionsOrError:
         ...
 
 
+# A page, either as HTML or as a parsed document. Parsing HTML into a document is
+# the most expensive step, so the document is built once and reused for all the
+# selectors.
+Page = Union[str, XPathExtractor]
+
+
+def parse_document(page: Page) -> XPathExtractor:
+    """Parse the page into a document, the same way xextract would."""
+    if isinstance(page, XPathExtractor):
+        return page
+    if "<?xml" in page[:128]:
+        return XmlXPathExtractor(page)
+    return HtmlXPathExtractor(page)
+
+
+class PageClass(NamedTuple):
+    """The result of classify_page()."""
+
+    correction: Optional[str]
+    is_not_found: bool
+
+
+# The page is read in chunks of this size, until it's classified.
+CLASSIFY_CHUNK_SIZE = 16 * 1024
+
+
+def classify_page(
+    page_html: str, *, find_correction: bool, stop_at_correction: bool
+) -> PageClass:
+    """Find the correction and check if the page is a NOT FOUND page.
+
+    Return the same as the find_correction() and is_not_found() methods of the
+    parsers, without parsing the whole page. Pages without "corrected" and
+    "noresults" in the text can't match the selectors, and aren't parsed at all.
+    Other pages are parsed incrementally, only until both answers are known, or
+    until the correction is found, if stop_at_correction is True.
+    """
+    page_bytes = page_html.encode("utf-8")
+    find_correction = find_correction and b"corrected" in page_bytes
+    find_not_found = b"noresults" in page_bytes
+    correction: Optional[str] = None
+    is_not_found = False
+    if not find_correction and not find_not_found:
+        return PageClass(correction=correction, is_not_found=is_not_found)
+
+    parser_class = (
+        etree.XMLPullParser if "<?xml" in page_html[:128] else etree.HTMLPullParser
+    )
+    parser = parser_class(
+        events=("start", "end"), tag=("span", "h1"), recover=True, encoding="utf-8"
+    )
+    # The first correction in the document order. Its text is known at the end
+    # of the element, but nested corrections end earlier.
+    correction_element = None
+    for start in range(0, len(page_bytes), CLASSIFY_CHUNK_SIZE):
+        parser.feed(page_bytes[start : start + CLASSIFY_CHUNK_SIZE])
+        for event, element in parser.read_events():
+            if event == "end":
+                if element is correction_element:
+                    correction = get_element_text(element)
+                    find_correction = False
+                continue
+            classes = (element.get("class") or "").split()
+            if find_correction and element.tag == "span" and "corrected" in classes:
+                if correction_element is None:
+                    correction_element = element
+            elif find_not_found and element.tag == "h1" and "noresults" in classes:
+                is_not_found = True
+                find_not_found = False
+        if (not find_correction and not find_not_found) or (
+            stop_at_correction and correction
+        ):
+            break
+    return PageClass(correction=correction, is_not_found=is_not_found)
+
+
 class XExtractParser(IParser):
     def parse_search_result(
-        self, page_html: str, follow_corrections: FollowCorrections
+        self,
+        page_html: str,
+        follow_corrections: FollowCorrections,
+        sections: AbstractSet[SearchResultSection] = ALL_SECTIONS,
     ) -> SearchResultOrError:
         # find correction, if asked. We'll use it on not found or empty response.
-        correction = None
-
-        if follow_corrections in (
-            FollowCorrections.ALWAYS,
-            FollowCorrections.ON_EMPTY_TRANSLATIONS,
-        ):
-            correction = self.find_correction(page_html)
+        # Correction and not found pages are classified without building the
+        # document.
+        page_class = classify_page(
+            page_html,
+            find_correction=follow_corrections
+            in (FollowCorrections.ALWAYS, FollowCorrections.ON_EMPTY_TRANSLATIONS),
+            stop_at_correction=follow_corrections == FollowCorrections.ALWAYS,
+        )
+        correction = page_class.correction
 
         # check if the page is correction
         if correction and follow_corrections == FollowCorrections.ALWAYS:
             return Correction(correction=correction)
 
         # check if the page is a not found
-        if self.is_not_found(page_html):
+        if page_class.is_not_found:
             if correction:
                 return Correction(correction=correction)
             return NotFound()
 
-        # assume it's a valid result
-        result = self.parse_search_result_to_page(page_html)
+        # assume it's a valid result. Lemmas are needed to decide on the
+        # correction, even if they are not asked for.
+        if correction:
+            sections = sections | {SearchResultSection.LEMMAS}
+        result = self.parse_search_result_to_page(parse_document(page_html), sections)
 
         # Process ON_EMTPY case
         if correction and not result.lemmas:
@@ -65,32 +166,48 @@ class XExtractParser(IParser):
 
         return result
 
-    def is_not_found(self, page_html: str) -> bool:
+    def is_not_found(self, page: Page) -> bool:
         """Return True if the page is a NOT FOUND page."""
-        return String(css="h1.noresults").parse(page_html) != []
+        return not_found_schema.parse(page) != []
 
-    def find_correction(self, page_html: str) -> Optional[str]:
+    def find_correction(self, page: Page) -> Optional[str]:
         """Find the correction for a NOT FOUND page."""
-        corrections = String(css="span.corrected").parse(page_html)
+        corrections = correction_schema.parse(page)
         if corrections:
             return corrections[0]
         return None
 
-    def parse_search_result_to_page(self, page_html: str) -> SearchResult:
-        parsed_result = self.parse_search_result_to_dict(page_html)
+    def parse_search_result_to_page(
+        self,
+        page: Page,
+        sections: AbstractSet[SearchResultSection] = ALL_SECTIONS,
+    ) -> SearchResult:
+        parsed_result = self.parse_search_result_to_dict(page, sections)
         return SearchResult(**parsed_result)
 
-    def parse_search_result_to_dict(self, page_html: str) -> dict:
-        return search_result_schema.parse(page_html)
+    def parse_search_result_to_dict(
+        self,
+        page: Page,
+        sections: AbstractSet[SearchResultSection] = ALL_SECTIONS,
+    ) -> dict:
+        parsed_result = get_search_result_schema(frozenset(sections)).parse(page)
+        for section in ALL_SECTIONS - sections:
+            parsed_result[section.value] = []
+        return parsed_result
 
     def parse_autocompletions(self, page_html: str) -> AutocompletionsOrError:
-        parsed_result = self.parse_autocompletions_to_dict(page_html)
-        return Autocompletions(**parsed_result)
+        # autocompletions_schema is slow for the tiny pages, requested on every
+        # keystroke. The fast path returns the same results.
+        return autocompletions_parser.parse_autocompletions(page_html)
 
     def parse_autocompletions_to_dict(self, page_html: str) -> dict:
         return autocompletions_schema.parse(page_html)
 
 
+not_found_schema = String(css="h1.noresults")
+correction_schema = String(css="span.corrected")
+
+
 def is_featured(classname):
     return "featured" in classname
 
@@ -292,67 +409,84 @@ def normalize_source_url(content):
     return None
 
 
-search_result_schema = Group(
-    quant=1,
-    children=[
-        String(name="src_lang", css="div#data", attr="data-lang1", quant=1),
-        String(name="dst_lang", css="div#data", attr="data-lang2", quant=1),
-        String(name="query", css="div#data", attr="data-query", quant=1),
-        String(
-            name="correct_query",
-            css="div#data",
-            attr="data-correctspellingofquery",
-            quant=1,
-        ),
-        Group(
-            quant="*",
-            css="div.exact > div.lemma",
-            name="lemmas",
-            children=lemma_schema,
-        ),
-        Group(
-            quant="*",
-            css="div.example_lines div.lemma",
-            name="examples",
-            children=lemma_schema,
-        ),
-        Group(
-            quant="*",
-            css="table.result_table > tbody > tr",
-            name="external_sources",
-            children=[
-                String(
-                    name="src",
-                    css="td.left > div.wrap",
-                    quant=1,
-                    attr="_all_text",
-                    callback=normalize_example,
-                ),
-                String(
-                    name="dst",
-                    css="td.right2 > div.wrap",
-                    quant=1,
-                    attr="_all_text",
-                    callback=normalize_example,
-                ),
-                Group(
-                    name="src_url",
-                    quant=1,
-                    css="td.left",
-                    children=source_url_schema,
-                    callback=normalize_source_url,
-                ),
-                Group(
-                    name="dst_url",
-                    quant=1,
-                    css="td.right2",
-                    children=source_url_schema,
-                    callback=normalize_source_url,
-                ),
-            ],
-        ),
-    ],
-)
+search_result_header_schema = [
+    String(name="src_lang", css="div#data", attr="data-lang1", quant=1),
+    String(name="dst_lang", css="div#data", attr="data-lang2", quant=1),
+    String(name="query", css="div#data", attr="data-query", quant=1),
+    String(
+        name="correct_query",
+        css="div#data",
+        attr="data-correctspellingofquery",
+        quant=1,
+    ),
+]
+
+search_result_section_schemas = {
+    SearchResultSection.LEMMAS: Group(
+        quant="*",
+        css="div.exact > div.lemma",
+        name="lemmas",
+        children=lemma_schema,
+    ),
+    SearchResultSection.EXAMPLES: Group(
+        quant="*",
+        css="div.example_lines div.lemma",
+        name="examples",
+        children=lemma_schema,
+    ),
+    SearchResultSection.EXTERNAL_SOURCES: Group(
+        quant="*",
+        css="table.result_table > tbody > tr",
+        name="external_sources",
+        children=[
+            String(
+                name="src",
+                css="td.left > div.wrap",
+                quant=1,
+                attr="_all_text",
+                callback=normalize_example,
+            ),
+            String(
+                name="dst",
+                css="td.right2 > div.wrap",
+                quant=1,
+                attr="_all_text",
+                callback=normalize_example,
+            ),
+            Group(
+                name="src_url",
+                quant=1,
+                css="td.left",
+                children=source_url_schema,
+                callback=normalize_source_url,
+            ),
+            Group(
+                name="dst_url",
+                quant=1,
+                css="td.right2",
+                children=source_url_schema,
+                callback=normalize_source_url,
+            ),
+        ],
+    ),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def get_search_result_schema(sections: FrozenSet[SearchResultSection]) -> Group:
+    """Return the schema, that only extracts the given sections of the result."""
+    return Group(
+        quant=1,
+        children=search_result_header_schema
+        + [
+            schema
+            for section, schema in search_result_section_schemas.items()
+            if section in sections
+        ],
+    )
+
+
+search_result_schema = get_search_result_schema(ALL_SECTIONS)
 
 
 autocompletions_schema = Group(
@@ -0,0 +1,235 @@
+"""
+Warm up the caches with a list of queries.
+
+Read queries from a file, or from stdin, one per line, as tab-separated query,
+source and destination language codes, and request search results and
+autocompletions for them through the same client and caches as the API server.
+Empty lines and lines starting with "#" are skipped.
+
+The upstream rate limit is a token bucket in the memory of the process, so the
+tool doesn't share it with running API servers, and adds its own requests to
+theirs. Lower UPSTREAM_RATE_LIMIT for the tool accordingly.
+
+    python -m linguee_api.warm_cache queries.tsv
+    cut -f1-3 queries.tsv | python -m linguee_api.warm_cache - --concurrency 8
+
+Successfully processed queries, including queries that Linguee has no
+translation for, are appended to the state file, and skipped when the tool runs
+again with the same state file, so an interrupted warm-up continues where it
+stopped.
+"""
+import argparse
+import asyncio
+import pathlib
+import sys
+import time
+from typing import IO, Iterable, Iterator, List, NamedTuple, Optional, Set, cast
+
+from loguru import logger
+
+from linguee_api.config import settings
+from linguee_api.const import LANGUAGE_CODE, LANGUAGES
+from linguee_api.factory import make_client
+from linguee_api.linguee_client import NOT_FOUND_MESSAGE, LingueeClient
+from linguee_api.models import FollowCorrections, ParseError
+
+
+class WarmUpQuery(NamedTuple):
+    query: str
+    src: LANGUAGE_CODE
+    dst: LANGUAGE_CODE
+
+    def to_line(self) -> str:
+        return "\t".join(self)
+
+
+class WarmUpStats:
+    """Progress of the warm-up."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.started_at = time.monotonic()
+
+    @property
+    def throughput(self) -> float:
+        """Processed queries per second."""
+        elapsed = time.monotonic() - self.started_at
+        return (self.done + self.failed) / elapsed if elapsed else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.done + self.failed}/{self.total} queries, "
+            f"{self.failed} failed, {self.throughput:.1f} queries/s"
+        )
+
+
+def read_queries(lines: Iterable[str]) -> Iterator[WarmUpQuery]:
+    """Parse tab-separated queries. Raise ValueError on invalid lines."""
+    for line_number, line in enumerate(lines, start=1):
+        line = line.rstrip("\r\n")
+        if not line.strip() or line.startswith("#"):
+            continue
+        fields = line.split("\t")
+        if len(fields) != 3:
+            raise ValueError(f"Line {line_number}: expected query, src and dst")
+        query, src, dst = fields
+        for lang in (src, dst):
+            if lang not in LANGUAGES:
+                raise ValueError(f"Line {line_number}: unknown language {lang!r}")
+        yield WarmUpQuery(query, cast(LANGUAGE_CODE, src), cast(LANGUAGE_CODE, dst))
+
+
+def read_state(state_file: pathlib.Path) -> Set[WarmUpQuery]:
+    if not state_file.exists():
+        return set()
+    with state_file.open(encoding="utf-8") as f:
+        return set(read_queries(f))
+
+
+async def warm_cache(
+    client: LingueeClient,
+    queries: List[WarmUpQuery],
+    *,
+    concurrency: int = 4,
+    state: Optional[IO[str]] = None,
+    autocompletions: bool = True,
+    progress_interval: float = 10.0,
+) -> WarmUpStats:
+    """Process the queries with at most `concurrency` requests at a time.
+
+    Successfully processed queries are written to the state file, one per line.
+    """
+    stats = WarmUpStats(total=len(queries))
+    queue: "asyncio.Queue[WarmUpQuery]" = asyncio.Queue()
+    for query in queries:
+        queue.put_nowait(query)
+
+    async def worker() -> None:
+        while not queue.empty():
+            query = queue.get_nowait()
+            if await try_process_query(client, query, autocompletions=autocompletions):
+                stats.done += 1
+                if state is not None:
+                    state.write(query.to_line() + "\n")
+                    state.flush()
+            else:
+                stats.failed += 1
+
+    async def report_progress() -> None:
+        while True:
+            await asyncio.sleep(progress_interval)
+            logger.info(f"Warming up: {stats}")
+
+    reporter = asyncio.ensure_future(report_progress())
+    try:
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+    finally:
+        reporter.cancel()
+    return stats
+
+
+async def try_process_query(
+    client: LingueeClient, query: WarmUpQuery, *, autocompletions: bool
+) -> bool:
+    """Same as process_query(), but an exception counts as a failure."""
+    try:
+        return await process_query(client, query, autocompletions=autocompletions)
+    except Exception:
+        logger.exception(f"Cannot warm up: {query=}")
+        return False
+
+
+async def process_query(
+    client: LingueeClient, query: WarmUpQuery, *, autocompletions: bool
+) -> bool:
+    """Request the search result and autocompletions. Return True on success."""
+    result = await client.process_search_result(
+        query=query.query,
+        src=query.src,
+        dst=query.dst,
+        guess_direction=False,
+        follow_corrections=FollowCorrections.ALWAYS,
+    )
+    if isinstance(result, ParseError):
+        if result.message == NOT_FOUND_MESSAGE:
+            # Nothing else to warm up. Retrying won't change the result.
+            logger.info(f"Translation not found: {query=}")
+            return True
+        logger.warning(f"Cannot warm up search result: {query=}, {result.message=}")
+        return False
+    if autocompletions:
+        autocompletions_result = await client.process_autocompletions(
+            query=query.query,
+            src_lang_code=query.src,
+            dst_lang_code=query.dst,
+        )
+        if isinstance(autocompletions_result, ParseError):
+            logger.warning(
+                f"Cannot warm up autocompletions: {query=}, "
+                f"{autocompletions_result.message=}"
+            )
+            return False
+    return True
+
+
+async def run(queries: List[WarmUpQuery], args: argparse.Namespace) -> WarmUpStats:
+    client = make_client(settings)
+    await client.open()
+    try:
+        args.state_file.parent.mkdir(parents=True, exist_ok=True)
+        with args.state_file.open("a", encoding="utf-8") as state:
+            return await warm_cache(
+                client,
+                queries,
+                concurrency=args.concurrency,
+                state=state,
+                autocompletions=not args.skip_autocompletions,
+            )
+    finally:
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("queries", help="File with queries, or - to read stdin")
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Queries to process at a time"
+    )
+    parser.add_argument(
+        "--state-file",
+        type=pathlib.Path,
+        default=settings.cache_directory / "warm_cache.state",
+        help="File with processed queries, to resume an interrupted warm-up",
+    )
+    parser.add_argument(
+        "--skip-autocompletions",
+        action="store_true",
+        help="Only request search results",
+    )
+    args = parser.parse_args()
+
+    try:
+        if args.queries == "-":
+            queries = list(read_queries(sys.stdin))
+        else:
+            with open(args.queries, encoding="utf-8") as f:
+                queries = list(read_queries(f))
+        done = read_state(args.state_file)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    pending = [query for query in queries if query not in done]
+    logger.info(
+        f"{len(queries)} queries, {len(queries) - len(pending)} already done, "
+        f"{len(pending)} to go"
+    )
+
+    stats = asyncio.run(run(pending, args))
+    logger.info(f"Done: {stats}")
+    if stats.failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from typing import AsyncIterator
+
 import pytest
 from pydantic import BaseSettings, Field
 
@@ -29,10 +31,12 @@ pytest_settings = PytestSettings()
 
 
 @pytest.fixture
-def examples_downloader() -> IDownloader:
-    return SQLiteCache(
+async def examples_downloader() -> AsyncIterator[IDownloader]:
+    cache = SQLiteCache(
         cache_database=settings.cache_database, upstream=pytest_settings.downloader
     )
+    yield cache
+    await cache.close()
 
 
 @pytest.fixture
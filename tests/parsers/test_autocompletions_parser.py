@@ -0,0 +1,77 @@
+import pytest
+
+from linguee_api import autocompletions_parser
+from linguee_api.models import Autocompletions
+from linguee_api.parsers import XExtractParser
+
+ITEM = (
+    '<div class="autocompletion_item">'
+    '<div class="main_row"><div class="main_item">Katze</div>'
+    '<div class="main_wordtype">f</div></div>'
+    '<div class="translation_row"><div>'
+    '<div class="translation_item">cat<div class="wordtype">n</div></div>'
+    '<div class="translation_item"> feline <div class="wordtype">n</div></div>'
+    "</div></div></div>"
+)
+
+
+def outcome(func) -> str:
+    """Return the result of the call, or the type of the raised exception."""
+    try:
+        return repr(func())
+    except Exception as e:
+        return type(e).__name__
+
+
+@pytest.mark.parametrize(
+    "page_html",
+    [
+        f'<div class="autocompletion">{ITEM}{ITEM}</div>',
+        '<?xml version="1.0"?>' + f'<div class="autocompletion">{ITEM}</div>',
+        # Class names are matched as whitespace-separated tokens
+        ITEM.replace('"main_row"', '" main_row\tfoo "'),
+        ITEM.replace('"main_row"', '"main_rows"'),
+        ITEM.replace('"main_row"', '"\xa0main_row"'),
+        ITEM.replace('"translation_item"', '"translation_item\n featured"'),
+        # Selectors check the tags and the direct parents
+        ITEM.replace('<div class="translation_row"><div>', "<div><div>"),
+        ITEM.replace('<div class="translation_row"><div>', "<span><div>"),
+        ITEM.replace(
+            '<div class="translation_row"><div>',
+            '<div class="translation_row"><span>',
+        ),
+        ITEM.replace("<div>", '<div class="translation_row">'),
+        ITEM.replace('<div class="main_wordtype">f</div>', ""),
+        ITEM.replace(
+            '<div class="main_wordtype">f</div>',
+            '<div class="main_wordtype">f</div><div class="main_wordtype">pl</div>',
+        ),
+        ITEM.replace('<div class="wordtype">n</div>', "<p>x</p> tail "),
+        # Nested items are matched too, in the document order
+        ITEM.replace("feline", ITEM),
+        ITEM.replace('<div class="main_item">Katze</div>', ""),
+        ITEM.replace('class="translation_item"', 'class="item"'),
+        "",
+        "<div/>",
+    ],
+)
+def test_autocompletions_parser_should_return_same_result_as_schema(
+    page_html: str,
+):
+    expected = outcome(
+        lambda: Autocompletions(
+            **XExtractParser().parse_autocompletions_to_dict(page_html)
+        )
+    )
+    result = outcome(lambda: autocompletions_parser.parse_autocompletions(page_html))
+    assert result == expected
+
+
+def test_autocompletions_parser_should_return_models():
+    result = autocompletions_parser.parse_autocompletions(ITEM)
+    assert result.json() == (
+        '{"autocompletions": [{"text": "Katze", "pos": "f", "translations": '
+        '[{"text": "cat", "pos": "n"}, {"text": "feline", "pos": "n"}]}]}'
+    )
+    translation = result.autocompletions[0].translations[0]
+    assert isinstance(translation, Autocompletions.AutocompletionItem.TranslationItem)
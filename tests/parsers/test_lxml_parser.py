@@ -0,0 +1,102 @@
+import sqlite3
+from typing import List, Tuple
+
+import pytest
+
+from linguee_api.config import settings
+from linguee_api.const import LANGUAGE_CODE
+from linguee_api.downloaders.interfaces import IDownloader
+from linguee_api.factory import make_page_codec
+from linguee_api.linguee_client import get_autocompletions_url, get_search_url
+from linguee_api.lxml_parser import LxmlParser
+from linguee_api.models import Autocompletions, FollowCorrections, SearchResultSection
+from linguee_api.parsers import XExtractParser
+
+
+def outcome(func) -> str:
+    """Return the result of the call, or the type of the raised exception."""
+    try:
+        return repr(func())
+    except Exception as e:
+        return type(e).__name__
+
+
+def assert_same_search_results(page_html: str):
+    for follow_corrections in FollowCorrections:
+        for sections in [set(SearchResultSection), {SearchResultSection.LEMMAS}]:
+            expected = outcome(
+                lambda: XExtractParser().parse_search_result(
+                    page_html, follow_corrections, sections
+                )
+            )
+            result = outcome(
+                lambda: LxmlParser().parse_search_result(
+                    page_html, follow_corrections, sections
+                )
+            )
+            assert result == expected
+
+
+def assert_same_autocompletions(page_html: str):
+    # Both parsers use the fast path for autocompletions. Compare it with the
+    # xextract schema.
+    expected = outcome(
+        lambda: Autocompletions(
+            **XExtractParser().parse_autocompletions_to_dict(page_html)
+        )
+    )
+    result = outcome(lambda: LxmlParser().parse_autocompletions(page_html))
+    assert result == expected
+
+
+@pytest.mark.parametrize(
+    ["query", "src", "dst"],
+    [
+        ("obrigado", "pt", "en"),
+        ("constibado", "pt", "en"),
+        ("Möglichkei", "de", "en"),
+        ("not bad", "en", "pt"),
+        ("xxxxzzzz", "pt", "en"),
+        ("einfach", "de", "en"),
+        ("bis", "de", "en"),
+    ],
+)
+@pytest.mark.asyncio
+async def test_lxml_parser_should_return_same_search_result_as_xextract(
+    examples_downloader: IDownloader,
+    query: str,
+    src: LANGUAGE_CODE,
+    dst: LANGUAGE_CODE,
+):
+    url = get_search_url(query=query, src=src, dst=dst, guess_direction=False)
+    assert_same_search_results(await examples_downloader.download(url))
+
+
+@pytest.mark.asyncio
+async def test_lxml_parser_should_return_same_autocompletions_as_xextract(
+    examples_downloader: IDownloader,
+):
+    url = get_autocompletions_url(query="katz", src="de", dst="en")
+    assert_same_autocompletions(await examples_downloader.download(url))
+
+
+def read_cached_pages() -> List[Tuple[str, str]]:
+    if not settings.cache_database.exists():
+        return []
+    codec = make_page_codec(settings)
+    with sqlite3.connect(settings.cache_database) as db:
+        return [
+            (url, codec.decode(page))
+            for url, page in db.execute("SELECT url, page FROM cache ORDER BY url")
+        ]
+
+
+def test_lxml_parser_should_return_same_results_on_all_cached_pages():
+    pages = read_cached_pages()
+    if not pages:
+        pytest.skip("The page cache is empty")
+    for url, page_html in pages:
+        if "qe=" in url:
+            assert_same_autocompletions(page_html)
+        else:
+            assert_same_search_results(page_html)
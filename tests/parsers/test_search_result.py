@@ -5,8 +5,8 @@ import pytest
 from linguee_api.const import LANGUAGE_CODE
 from linguee_api.downloaders.interfaces import IDownloader
 from linguee_api.linguee_client import get_search_url
-from linguee_api.models import UsageFrequency
-from linguee_api.parsers import XExtractParser
+from linguee_api.models import SearchResultSection, UsageFrequency
+from linguee_api.parsers import CLASSIFY_CHUNK_SIZE, XExtractParser, classify_page
 
 
 @pytest.mark.parametrize(
@@ -173,3 +173,60 @@ async def test_parser_should_find_lemma_forms_for_verbs(
     page_html = await examples_downloader.download(url)
     page = XExtractParser().parse_search_result_to_page(page_html)
     assert page.lemmas[0].forms == ["shrank or shrunk", "shrunk"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("section", list(SearchResultSection))
+async def test_parser_should_only_parse_given_sections(
+    examples_downloader: IDownloader, section: SearchResultSection
+):
+    url = get_search_url(query="obrigado", src="pt", dst="en", guess_direction=False)
+    page_html = await examples_downloader.download(url)
+    full_result = XExtractParser().parse_search_result_to_page(page_html)
+    result = XExtractParser().parse_search_result_to_page(page_html, {section})
+    for other_section in SearchResultSection:
+        expected = getattr(full_result, other_section.value)
+        if other_section != section:
+            expected = []
+        assert getattr(result, other_section.value) == expected
+
+
+@pytest.mark.parametrize(
+    ["page_html", "correction", "is_not_found"],
+    [
+        ("", None, False),
+        ('<div class="exact"></div>', None, False),
+        ('<h1 class="noresults">Not found</h1>', None, True),
+        ('<h1 class="noresults"></h1><span class="corrected">foo</span>', "foo", True),
+        ('<span class="corrected">foo <b>bar</b> baz</span>', "foo  baz", False),
+        # The first correction in the document order wins
+        (
+            '<span class="corrected">a<span class="corrected">b</span></span>',
+            "a",
+            False,
+        ),
+        # Beyond the first chunk
+        (
+            " " * CLASSIFY_CHUNK_SIZE + '<span class="corrected">foo</span>',
+            "foo",
+            False,
+        ),
+    ],
+)
+def test_classify_page_should_match_parser(
+    page_html: str, correction: Optional[str], is_not_found: bool
+):
+    page_class = classify_page(
+        page_html, find_correction=True, stop_at_correction=False
+    )
+    assert page_class.correction == correction
+    assert page_class.is_not_found == is_not_found
+    parser = XExtractParser()
+    assert parser.find_correction(page_html) == correction
+    assert parser.is_not_found(page_html) == is_not_found
+
+
+def test_classify_page_should_stop_at_correction():
+    page_html = '<span class="corrected">foo</span><h1 class="noresults"></h1>'
+    page_class = classify_page(page_html, find_correction=True, stop_at_correction=True)
+    assert page_class.correction == "foo"
@@ -0,0 +1,49 @@
+import pytest
+
+from linguee_api.downloaders.circuit_breaker import CircuitBreakerDownloader
+from linguee_api.downloaders.interfaces import IDownloader, UpstreamBlockedError
+
+
+class BlockedDownloader(IDownloader):
+    def __init__(self):
+        self.blocked = True
+        self.calls = 0
+
+    async def download(self, url: str) -> str:
+        self.calls += 1
+        if self.blocked:
+            raise UpstreamBlockedError("blocked")
+        return "foo"
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_should_open_after_consecutive_503s():
+    upstream = BlockedDownloader()
+    downloader = CircuitBreakerDownloader(
+        upstream=upstream, failure_threshold=2, reset_timeout=60
+    )
+    for _ in range(3):
+        with pytest.raises(UpstreamBlockedError):
+            await downloader.download("https://example.com")
+    assert downloader.is_open
+    assert upstream.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_should_close_after_successful_probe():
+    upstream = BlockedDownloader()
+    downloader = CircuitBreakerDownloader(
+        upstream=upstream, failure_threshold=1, reset_timeout=0
+    )
+    with pytest.raises(UpstreamBlockedError):
+        await downloader.download("https://example.com")
+    assert downloader.is_open
+
+    # Failed probe keeps the circuit open
+    with pytest.raises(UpstreamBlockedError, match="blocked"):
+        await downloader.download("https://example.com")
+    assert downloader.is_open
+
+    upstream.blocked = False
+    assert await downloader.download("https://example.com") == "foo"
+    assert not downloader.is_open
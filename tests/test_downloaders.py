@@ -1,10 +1,12 @@
 import random
 import string
 
+import httpx
 import pytest
 
 from linguee_api.downloaders.httpx_downloader import HTTPXDownloader
-from linguee_api.downloaders.interfaces import DownloaderError
+from linguee_api.downloaders.interfaces import DownloaderError, UpstreamBlockedError
+from linguee_api.downloaders.memory_cache import MemoryCache
 
 
 @pytest.mark.asyncio
@@ -30,3 +32,47 @@ async def test_httpx_downloader_should_raise_exception_on_non200_code():
     invalid_url = "https://httpbin.org/status/403"
     with pytest.raises(DownloaderError):
         await HTTPXDownloader().download(invalid_url)
+
+
+@pytest.mark.asyncio
+async def test_httpx_downloader_should_reuse_client_between_downloads():
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, text="foo"))
+    downloader = HTTPXDownloader(transport=transport)
+    await downloader.open()
+    client = downloader._client
+    assert await downloader.download("https://example.com/1") == "foo"
+    assert await downloader.download("https://example.com/2") == "foo"
+    assert downloader._client is client
+
+    await downloader.close()
+    assert client.is_closed
+    assert downloader._client is None
+
+
+@pytest.mark.asyncio
+async def test_httpx_downloader_should_raise_exception_on_503():
+    transport = httpx.MockTransport(lambda request: httpx.Response(503))
+    downloader = HTTPXDownloader(transport=transport)
+    with pytest.raises(UpstreamBlockedError, match="temporarily blocked"):
+        await downloader.download("https://example.com")
+    await downloader.close()
+
+
+@pytest.mark.asyncio
+async def test_downloader_chain_should_propagate_open_and_close():
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, text="foo"))
+    downloader = HTTPXDownloader(transport=transport)
+    chain = MemoryCache(upstream=downloader)
+    await chain.open()
+    assert downloader._client is not None
+    await chain.close()
+    assert downloader._client is None
+
+
+@pytest.mark.asyncio
+async def test_httpx_downloader_should_use_proxy_and_local_address():
+    downloader = HTTPXDownloader(
+        proxy="http://localhost:3128", local_address="127.0.0.1"
+    )
+    assert isinstance(downloader._get_transport(), httpx.AsyncHTTPTransport)
+    await downloader.close()
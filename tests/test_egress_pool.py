@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from linguee_api.downloaders.egress_pool import EgressPoolDownloader, EgressRoute
+from linguee_api.downloaders.interfaces import IDownloader, UpstreamBlockedError
+
+
+class RouteDownloader(IDownloader):
+    def __init__(self, name, blocked=False):
+        self.name = name
+        self.blocked = blocked
+        self.calls = 0
+
+    async def download(self, url: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.blocked:
+            raise UpstreamBlockedError("blocked")
+        return self.name
+
+
+@pytest.mark.asyncio
+async def test_egress_pool_should_spread_requests_across_routes():
+    downloaders = [RouteDownloader("a"), RouteDownloader("b")]
+    pool = EgressPoolDownloader([EgressRoute(d.name, d) for d in downloaders])
+    pages = await asyncio.gather(
+        *[pool.download("https://example.com") for _ in range(4)]
+    )
+    assert sorted(pages) == ["a", "a", "b", "b"]
+    assert [route.requests for route in pool.routes] == [2, 2]
+
+
+@pytest.mark.asyncio
+async def test_egress_pool_should_eject_blocked_routes():
+    blocked, healthy = RouteDownloader("a", blocked=True), RouteDownloader("b")
+    pool = EgressPoolDownloader(
+        [EgressRoute("a", blocked), EgressRoute("b", healthy)], ejection_time=60
+    )
+    assert await pool.download("https://example.com") == "b"
+    assert await pool.download("https://example.com") == "b"
+    assert blocked.calls == 1
+    assert pool.routes[0].blocks == 1
+
+    healthy.blocked = True
+    with pytest.raises(UpstreamBlockedError, match="All egress routes"):
+        await pool.download("https://example.com")
@@ -1,3 +1,5 @@
+import os
+import time
 from pathlib import Path
 
 import pytest
@@ -20,3 +22,47 @@ async def test_file_cache_should_cache_a_value(tmp_path):
 
     # The value should be the same
     assert result2 == "foo"
+
+
+@pytest.mark.asyncio
+async def test_file_cache_should_shard_page_files(tmp_path):
+    cache = FileCache(cache_directory=Path(tmp_path), upstream=MockDownloader())
+    await cache.download("https://example.com")
+
+    page_file = cache._get_page_file("https://example.com")
+    assert page_file.is_file()
+    assert page_file.parent.parent.parent == Path(tmp_path)
+    assert [p.name for p in page_file.parent.iterdir()] == [page_file.name]
+
+
+@pytest.mark.asyncio
+async def test_file_cache_should_migrate_flat_layout(tmp_path):
+    cache = FileCache(
+        cache_directory=Path(tmp_path), upstream=MockDownloader(message="bar")
+    )
+    for url in ("https://example.com/1", "https://example.com/2"):
+        cache._get_legacy_page_file(url).write_text("foo", encoding="utf-8")
+
+    # Legacy files are moved on read...
+    assert await cache.download("https://example.com/1") == "foo"
+    assert not cache._get_legacy_page_file("https://example.com/1").exists()
+
+    # ... or all at once
+    assert await cache.migrate_flat_layout() == 1
+    assert await cache.get_from_cache("https://example.com/2") == "foo"
+
+
+@pytest.mark.asyncio
+async def test_file_cache_should_download_pages_older_than_hard_ttl(tmp_path):
+    cache = FileCache(
+        cache_directory=Path(tmp_path),
+        upstream=MockDownloader(message="foo"),
+        hard_ttl=3600,
+    )
+    await cache.download("https://example.com")
+    page_file = cache._get_page_file("https://example.com")
+    mtime = time.time() - 7200
+    os.utime(page_file, (mtime, mtime))
+
+    cache.upstream = MockDownloader(message="bar")
+    assert await cache.download("https://example.com") == "bar"
@@ -1,8 +1,24 @@
+import time
+from pathlib import Path
+
 import pytest
 
 from linguee_api.const import LANGUAGE_CODE, LANGUAGES
+from linguee_api.downloaders.error_downloader import ErrorDownloader
+from linguee_api.downloaders.interfaces import DownloaderError, IDownloader
+from linguee_api.downloaders.mock_downloader import MockDownloader
+from linguee_api.downloaders.sqlite_cache import SQLiteCache
 from linguee_api.linguee_client import LingueeClient
-from linguee_api.models import FollowCorrections, ParseError, SearchResult
+from linguee_api.models import (
+    Correction,
+    FollowCorrections,
+    NotFound,
+    ParseError,
+    SearchResult,
+    SearchResultSection,
+)
+from linguee_api.negative_cache import NegativeCache
+from linguee_api.parsers import IParser
 
 
 @pytest.mark.asyncio
@@ -56,3 +72,192 @@ async def test_linguee_client_should_process_test_requests(
         follow_corrections=FollowCorrections.ALWAYS,
     )
     assert isinstance(search_result, SearchResult)
+
+
+class CountingParser(IParser):
+    def __init__(self):
+        self.calls = 0
+
+    def parse_search_result(self, page_html, follow_corrections, sections=None):
+        self.calls += 1
+        return SearchResult(
+            src_lang="pt",
+            dst_lang="en",
+            query=page_html,
+            correct_query=page_html,
+            lemmas=[],
+            examples=[],
+            external_sources=[],
+        )
+
+    def parse_autocompletions(self, page_html):
+        raise NotImplementedError()
+
+
+@pytest.mark.asyncio
+async def test_linguee_client_should_return_result_from_result_cache(tmp_path):
+    parser = CountingParser()
+    client = LingueeClient(
+        page_downloader=MockDownloader(message="obrigado"),
+        page_parser=parser,
+        result_cache=SQLiteCache(
+            cache_database=Path(tmp_path) / "results.db", upstream=ErrorDownloader()
+        ),
+    )
+    try:
+        results = [
+            await client.process_search_result(
+                query="obrigado",
+                src="pt",
+                dst="en",
+                guess_direction=False,
+                follow_corrections=FollowCorrections.ALWAYS,
+            )
+            for _ in range(2)
+        ]
+    finally:
+        await client.close()
+    assert parser.calls == 1
+    assert results[0] == results[1]
+    assert isinstance(results[1], SearchResult)
+
+
+@pytest.mark.asyncio
+async def test_linguee_client_should_process_stale_results_again(tmp_path, monkeypatch):
+    parser = CountingParser()
+    client = LingueeClient(
+        page_downloader=MockDownloader(message="obrigado"),
+        page_parser=parser,
+        result_cache=SQLiteCache(
+            cache_database=Path(tmp_path) / "results.db",
+            upstream=ErrorDownloader(),
+            soft_ttl=60,
+        ),
+    )
+
+    async def process():
+        await client.process_search_result(
+            query="obrigado",
+            src="pt",
+            dst="en",
+            guess_direction=False,
+            follow_corrections=FollowCorrections.ALWAYS,
+        )
+
+    try:
+        await process()
+        await process()
+        assert parser.calls == 1
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now + 120)
+        await process()
+        assert parser.calls == 2
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_linguee_client_should_cache_results_by_sections(tmp_path):
+    parser = CountingParser()
+    client = LingueeClient(
+        page_downloader=MockDownloader(message="obrigado"),
+        page_parser=parser,
+        result_cache=SQLiteCache(
+            cache_database=Path(tmp_path) / "results.db", upstream=ErrorDownloader()
+        ),
+    )
+
+    async def process(sections):
+        await client.process_search_result(
+            query="obrigado",
+            src="pt",
+            dst="en",
+            guess_direction=False,
+            follow_corrections=FollowCorrections.ALWAYS,
+            sections=sections,
+        )
+
+    try:
+        await process({SearchResultSection.LEMMAS})
+        await process({SearchResultSection.LEMMAS})
+        assert parser.calls == 1
+        # The partial result doesn't have all the sections
+        await process(set(SearchResultSection))
+        assert parser.calls == 2
+        # The full result has
+        await process({SearchResultSection.EXAMPLES})
+        assert parser.calls == 2
+    finally:
+        await client.close()
+
+
+class FailingDownloader(IDownloader):
+    def __init__(self):
+        self.calls = 0
+
+    async def download(self, url):
+        self.calls += 1
+        raise DownloaderError("Linguee is blocking us")
+
+
+@pytest.mark.asyncio
+async def test_linguee_client_should_return_error_from_negative_cache():
+    downloader = FailingDownloader()
+    negative_cache = NegativeCache()
+    client = LingueeClient(
+        page_downloader=downloader,
+        page_parser=CountingParser(),
+        negative_cache=negative_cache,
+    )
+    for _ in range(2):
+        result = await client.process_autocompletions(
+            query="obrigado", src_lang_code="pt", dst_lang_code="en"
+        )
+        assert result == ParseError(message="Linguee is blocking us")
+    assert downloader.calls == 1
+    assert (negative_cache.hits, negative_cache.misses) == (1, 1)
+
+
+class UrlDownloader(IDownloader):
+    """Return the URL as the page."""
+
+    def __init__(self):
+        self.urls = []
+
+    async def download(self, url):
+        self.urls.append(url)
+        return url
+
+
+class CorrectingParser(CountingParser):
+    def parse_search_result(self, page_html, follow_corrections, sections=None):
+        if "constibado" not in page_html:
+            return super().parse_search_result(page_html, follow_corrections)
+        if follow_corrections == FollowCorrections.NEVER:
+            return NotFound()
+        return Correction(correction="constipado")
+
+
+@pytest.mark.asyncio
+async def test_linguee_client_should_not_cache_not_found_if_corrections_not_followed():
+    downloader = UrlDownloader()
+    client = LingueeClient(
+        page_downloader=downloader,
+        page_parser=CorrectingParser(),
+        negative_cache=NegativeCache(),
+    )
+
+    async def process(follow_corrections):
+        return await client.process_search_result(
+            query="constibado",
+            src="pt",
+            dst="en",
+            guess_direction=False,
+            follow_corrections=follow_corrections,
+        )
+
+    not_found = await process(FollowCorrections.NEVER)
+    assert not_found == ParseError(message="Translation not found")
+    corrected = await process(FollowCorrections.ALWAYS)
+    assert isinstance(corrected, SearchResult)
+    assert "constipado" in downloader.urls[-1]
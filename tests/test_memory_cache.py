@@ -31,3 +31,34 @@ async def test_memory_cache_should_evict_cache_on_overflow():
 
     # The value should be the new one
     assert result2 == "bar"
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_should_be_bounded_by_bytes():
+    cache = MemoryCache(upstream=MockDownloader(message="x" * 1000), max_bytes=5000)
+    for i in range(10):
+        await cache.download(f"https://example.com/{i}")
+    assert cache.bytes <= 5000
+    assert cache.evictions == 10 - len(cache)
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_should_not_evict_popular_pages_for_one_off_ones():
+    cache = MemoryCache(upstream=MockDownloader(message="foo"), maxsize=1)
+    for _ in range(3):
+        await cache.download("https://example.com/popular")
+    await cache.download("https://example.com/one-off")
+    assert cache.rejections == 1
+
+    cache.upstream = MockDownloader(message="bar")
+    assert await cache.download("https://example.com/popular") == "foo"
+    assert (cache.hits, cache.misses) == (3, 2)
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_should_clear_pages():
+    cache = MemoryCache(upstream=MockDownloader(message="foo"))
+    await cache.download("https://example.com")
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.bytes == 0
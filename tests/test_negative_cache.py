@@ -0,0 +1,28 @@
+from linguee_api.negative_cache import NegativeCache
+
+
+def test_negative_cache_should_count_hits_and_misses():
+    cache = NegativeCache()
+    assert cache.get("foo") is None
+    cache.put_not_found("foo", "Translation not found")
+    assert cache.get("foo") == "Translation not found"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_negative_cache_should_expire_entries():
+    cache = NegativeCache(not_found_ttl=300, error_ttl=0)
+    cache.put_error("foo", "Linguee is blocking us")
+    assert cache.get("foo") is None
+
+    cache.put_not_found("bar", "Translation not found")
+    key, (message, expires_at) = next(iter(cache._entries.items()))
+    cache._entries[key] = (message, expires_at - 300)
+    assert cache.get("bar") is None
+
+
+def test_negative_cache_should_drop_oldest_entries():
+    cache = NegativeCache(max_size=2)
+    for key in ("foo", "bar", "baz"):
+        cache.put_error(key, "error")
+    assert cache.get("foo") is None
+    assert cache.get("baz") == "error"
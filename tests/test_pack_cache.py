@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import pytest
+
+from linguee_api.build_pack import read_sqlite_pages
+from linguee_api.downloaders.mock_downloader import MockDownloader
+from linguee_api.downloaders.pack_cache import PackCache, write_pack
+from linguee_api.downloaders.page_codec import PageCodec
+from linguee_api.downloaders.sqlite_cache import SQLiteCache
+
+
+@pytest.fixture
+async def make_cache(tmp_path):
+    """Return a PackCache factory. All created caches are closed on teardown."""
+    caches = []
+
+    def make(pages, message="foo"):
+        pack_file = Path(tmp_path) / "pages.pack"
+        codec = PageCodec()
+        write_pack(pack_file, [(url, codec.encode(page)) for url, page in pages])
+        cache = PackCache(pack_file, upstream=MockDownloader(message=message))
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_pack_cache_should_find_pages(make_cache):
+    pages = [(f"https://example.com/{i}", f"page {i}") for i in range(100)]
+    cache = make_cache(pages, message="miss")
+    assert len(cache) == 100
+    for url, page in pages:
+        assert await cache.download(url) == page
+    assert await cache.download("https://example.com/100") == "miss"
+
+
+@pytest.mark.asyncio
+async def test_pack_cache_should_treat_missing_pack_as_empty(tmp_path):
+    cache = PackCache(Path(tmp_path) / "missing.pack", upstream=MockDownloader())
+    assert await cache.get_from_cache("https://example.com") is None
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_pack_should_be_built_from_sqlite_cache(tmp_path, make_cache):
+    sqlite_cache = SQLiteCache(Path(tmp_path) / "cache.db", upstream=MockDownloader())
+    try:
+        await sqlite_cache.put_to_cache("https://example.com", "foo")
+    finally:
+        await sqlite_cache.close()
+
+    pages = read_sqlite_pages(Path(tmp_path) / "cache.db", PageCodec())
+    codec = PageCodec()
+    assert [(url, codec.decode(page)) for url, page in pages] == [
+        ("https://example.com", "foo")
+    ]
@@ -0,0 +1,42 @@
+import pytest
+
+from linguee_api.downloaders.page_codec import (
+    ZSTD_MARKER,
+    PageCodec,
+    PageDecodeError,
+    train_zstd_dictionary,
+    zstandard,
+)
+
+PAGE = "<div class='lemma'><a class='dictLink'>Möglichkeit</a></div>" * 100
+
+
+@pytest.mark.parametrize("method", ["none", "zlib", "zstd"])
+def test_page_codec_should_decode_encoded_page(method):
+    if method == "zstd" and zstandard is None:
+        pytest.skip("zstandard is not installed")
+    codec = PageCodec(method)
+    encoded = codec.encode(PAGE)
+    assert codec.decode(encoded) == PAGE
+    if method != "none":
+        assert len(encoded) < len(PAGE)
+
+
+def test_page_codec_should_decode_uncompressed_pages():
+    codec = PageCodec("zlib")
+    assert codec.decode(PAGE) == PAGE
+    assert codec.decode(PAGE.encode("utf-8")) == PAGE
+
+
+@pytest.mark.skipif(zstandard is None, reason="zstandard is not installed")
+def test_page_codec_should_use_zstd_dictionary():
+    pages = [PAGE.replace("Möglichkeit", f"word{i}") for i in range(100)]
+    dictionary = train_zstd_dictionary(pages, dict_size=4096)
+    codec = PageCodec("zstd", zstd_dictionary=dictionary)
+    assert codec.decode(codec.encode(pages[0])) == pages[0]
+    assert len(codec.encode(pages[0])) < len(PageCodec("zstd").encode(pages[0]))
+
+
+def test_page_codec_should_raise_decode_error_on_broken_page():
+    with pytest.raises(PageDecodeError):
+        PageCodec("zlib").decode(ZSTD_MARKER + b"not a zstd frame")
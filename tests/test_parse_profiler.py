@@ -0,0 +1,134 @@
+import json
+import pathlib
+from typing import Iterator, Type
+
+import pytest
+
+from linguee_api import autocompletions_parser, lxml_parser, parsers
+from linguee_api.config import Settings
+from linguee_api.factory import make_parser_pool
+from linguee_api.lxml_parser import LxmlParser
+from linguee_api.models import Correction, FollowCorrections, SearchResult
+from linguee_api.parse_profiler import ParseProfiler
+from linguee_api.parsers import IParser, XExtractParser
+
+AUTOCOMPLETIONS_PAGE = (
+    '<div class="autocompletion">'
+    '<div class="autocompletion_item">'
+    '<div class="main_row"><div class="main_item">Katze</div>'
+    '<div class="main_wordtype">f</div></div>'
+    '<div class="translation_row"><div>'
+    '<div class="translation_item">cat<div class="wordtype">n</div></div>'
+    '<div class="translation_item">kitty<div class="wordtype">n</div></div>'
+    "</div></div></div></div>"
+)
+CORRECTION_PAGE = (
+    '<html><body><h1 class="noresults">Not found</h1>'
+    '<span class="corrected">constipado</span></body></html>'
+)
+SEARCH_RESULT_PAGE = (
+    '<html><body><div id="data" data-lang1="pt" data-lang2="en"'
+    ' data-query="obrigado" data-correctspellingofquery=""></div>'
+    '<div class="exact"><div class="lemma featured">'
+    '<span class="tag_lemma"><a class="dictLink">obrigado</a>'
+    '<span class="tag_wordtype">adjective</span></span>'
+    '<div class="translation_lines"><div class="translation featured">'
+    '<a class="dictLink">thank you</a><span class="tag_type" title="interjection">'
+    "</span></div></div></div></div></body></html>"
+)
+
+PARSER_CLASSES = [XExtractParser, LxmlParser]
+
+
+@pytest.fixture
+def profiler() -> Iterator[ParseProfiler]:
+    profiler = ParseProfiler()
+    profiler.enable()
+    yield profiler
+    profiler.disable()
+
+
+@pytest.mark.parametrize("parser_class", PARSER_CLASSES)
+def test_parse_profiler_should_record_autocompletions(
+    profiler: ParseProfiler, parser_class: Type[IParser]
+):
+    expected = parser_class().parse_autocompletions(AUTOCOMPLETIONS_PAGE)
+    profiler.disable()
+    profiler.enable()
+    for _ in range(2):
+        assert parser_class().parse_autocompletions(AUTOCOMPLETIONS_PAGE) == expected
+    stats = profiler.get_stats()
+    assert stats["autocompletions"]["calls"] == 3
+    assert stats["autocompletions/document"]["calls"] == 3
+    assert stats["autocompletions/item"]["calls"] == 3
+    assert stats["autocompletions/item/translation"]["calls"] == 6
+
+
+@pytest.mark.parametrize("parser_class", PARSER_CLASSES)
+def test_parse_profiler_should_record_search_result(
+    profiler: ParseProfiler, parser_class: Type[IParser]
+):
+    result = parser_class().parse_search_result(
+        SEARCH_RESULT_PAGE, FollowCorrections.NEVER
+    )
+    assert isinstance(result, SearchResult)
+    assert result.lemmas[0].translations[0].text == "thank you"
+    stats = profiler.get_stats()
+    assert stats["search_result"]["calls"] == 1
+    assert stats["search_result/classify"]["calls"] == 1
+    assert stats["search_result/document"]["calls"] == 1
+
+
+def test_parse_profiler_should_record_xextract_fields(profiler: ParseProfiler):
+    XExtractParser().parse_search_result(SEARCH_RESULT_PAGE, FollowCorrections.NEVER)
+    stats = profiler.get_stats()
+    assert stats["search_result/lemmas"]["matches"] == 1
+    assert stats["search_result/lemmas/translations/text"]["matches"] == 1
+    assert stats["search_result/lemmas/text/item [normalize]"]["calls"] == 1
+    assert stats["search_result/examples"]["matches"] == 0
+
+
+def test_parse_profiler_should_record_lxml_functions(profiler: ParseProfiler):
+    LxmlParser().parse_search_result(SEARCH_RESULT_PAGE, FollowCorrections.NEVER)
+    stats = profiler.get_stats()
+    assert stats["search_result/lemma"]["calls"] == 1
+    assert stats["search_result/lemma/translation"]["calls"] == 1
+
+
+@pytest.mark.parametrize("parser_class", PARSER_CLASSES)
+def test_parse_profiler_should_record_correction(
+    profiler: ParseProfiler, parser_class: Type[IParser]
+):
+    result = parser_class().parse_search_result(
+        CORRECTION_PAGE, FollowCorrections.ALWAYS
+    )
+    assert isinstance(result, Correction)
+    assert result.correction == "constipado"
+    stats = profiler.get_stats()
+    assert stats["search_result/classify"]["calls"] == 1
+    assert "search_result/document" not in stats
+
+
+def test_parse_profiler_should_restore_parsers(profiler: ParseProfiler):
+    profiler.disable()
+    XExtractParser().parse_search_result(SEARCH_RESULT_PAGE, FollowCorrections.NEVER)
+    LxmlParser().parse_autocompletions(AUTOCOMPLETIONS_PAGE)
+    assert profiler.get_stats() == {}
+    assert "_parse" not in parsers.search_result_header_schema[0].__dict__
+    assert parsers.classify_page.__name__ == "classify_page"
+    assert lxml_parser.parse_lemma.__name__ == "parse_lemma"
+    assert autocompletions_parser.parse_tree.__name__ == "parse_tree"
+    assert LxmlParser.parse_search_result.__name__ == "parse_search_result"
+
+
+def test_parse_profiler_should_dump_stats(profiler: ParseProfiler, tmp_path):
+    LxmlParser().parse_autocompletions(AUTOCOMPLETIONS_PAGE)
+    dump_file: pathlib.Path = tmp_path / "profile" / "parse-profile.json"
+    profiler.dump(dump_file)
+    assert json.loads(dump_file.read_text()) == profiler.get_stats()
+
+
+def test_parse_profiling_should_not_work_with_parser_pool():
+    settings = Settings(parse_profiling=True, parser_pool=True)
+    with pytest.raises(ValueError):
+        make_parser_pool(settings, XExtractParser())
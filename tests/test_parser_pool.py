@@ -0,0 +1,87 @@
+from typing import AsyncIterator
+
+import pytest
+
+from linguee_api.models import (
+    Autocompletions,
+    Correction,
+    FollowCorrections,
+    NotFound,
+)
+from linguee_api.parser_pool import ParserPool
+from linguee_api.parsers import XExtractParser
+
+NOT_FOUND_PAGE = '<html><body><h1 class="noresults">Not found</h1></body></html>'
+CORRECTION_PAGE = (
+    '<html><body><h1 class="noresults">Not found</h1>'
+    '<span class="corrected">constipado</span></body></html>'
+)
+AUTOCOMPLETIONS_PAGE = (
+    '<div class="autocompletion">'
+    '<div class="autocompletion_item">'
+    '<div class="main_row"><div class="main_item">Katze</div>'
+    '<div class="main_wordtype">f</div></div>'
+    '<div class="translation_row"><div>'
+    '<div class="translation_item">cat<div class="wordtype">n</div></div>'
+    "</div></div></div></div>"
+)
+
+
+@pytest.fixture
+async def parser_pool() -> AsyncIterator[ParserPool]:
+    pool = ParserPool(XExtractParser(), max_workers=1, inline_threshold=0)
+    await pool.open()
+    yield pool
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_parser_pool_should_parse_search_results_in_worker(
+    parser_pool: ParserPool,
+):
+    not_found = await parser_pool.parse_search_result(
+        NOT_FOUND_PAGE, FollowCorrections.ALWAYS
+    )
+    correction = await parser_pool.parse_search_result(
+        CORRECTION_PAGE, FollowCorrections.ALWAYS
+    )
+    assert isinstance(not_found, NotFound)
+    assert isinstance(correction, Correction)
+    assert correction.correction == "constipado"
+
+
+@pytest.mark.asyncio
+async def test_parser_pool_should_return_same_result_as_parser(
+    parser_pool: ParserPool,
+):
+    expected = XExtractParser().parse_autocompletions(AUTOCOMPLETIONS_PAGE)
+    result = await parser_pool.parse_autocompletions(AUTOCOMPLETIONS_PAGE)
+    assert isinstance(result, Autocompletions)
+    assert result == expected
+    assert result.autocompletions[0].translations[0].text == "cat"
+
+
+@pytest.mark.asyncio
+async def test_parser_pool_should_parse_small_pages_inline():
+    pool = ParserPool(XExtractParser(), inline_threshold=1024)
+    result = await pool.parse_autocompletions(AUTOCOMPLETIONS_PAGE)
+    assert isinstance(result, Autocompletions)
+    # The worker processes were never started
+    assert pool._executor is None
+
+
+@pytest.mark.asyncio
+async def test_parser_pool_should_recover_if_worker_dies(parser_pool: ParserPool):
+    await parser_pool.parse_autocompletions(AUTOCOMPLETIONS_PAGE)
+    executor = parser_pool._executor
+    assert executor is not None
+    for process in list(executor._processes.values()):  # type: ignore
+        process.kill()
+        process.join()
+
+    # The page is parsed in the event loop, and the pool is restarted
+    expected = XExtractParser().parse_autocompletions(AUTOCOMPLETIONS_PAGE)
+    assert await parser_pool.parse_autocompletions(AUTOCOMPLETIONS_PAGE) == expected
+    assert parser_pool._executor is None
+    assert await parser_pool.parse_autocompletions(AUTOCOMPLETIONS_PAGE) == expected
+    assert parser_pool._executor is not None
@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+from linguee_api.downloaders.interfaces import DownloaderError
+from linguee_api.downloaders.mock_downloader import MockDownloader
+from linguee_api.downloaders.rate_limiter import RateLimitedDownloader
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_should_let_burst_through_and_delay_the_rest():
+    downloader = RateLimitedDownloader(upstream=MockDownloader(), rate=50, burst=2)
+    loop = asyncio.get_running_loop()
+
+    started_at = loop.time()
+    await asyncio.gather(
+        *[downloader.download("https://example.com") for _ in range(2)]
+    )
+    assert loop.time() - started_at < 0.01
+
+    await asyncio.gather(
+        *[downloader.download("https://example.com") for _ in range(3)]
+    )
+    assert loop.time() - started_at >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_should_fail_when_delay_is_too_long():
+    downloader = RateLimitedDownloader(
+        upstream=MockDownloader(), rate=1, burst=1, max_delay=0.5
+    )
+    await downloader.download("https://example.com")
+    with pytest.raises(DownloaderError, match="Too many requests"):
+        await downloader.download("https://example.com")
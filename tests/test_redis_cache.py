@@ -0,0 +1,116 @@
+import shutil
+import socket
+import subprocess
+import time
+
+import pytest
+
+from linguee_api.downloaders.mock_downloader import MockDownloader
+
+pytest.importorskip("redis")
+
+from linguee_api.downloaders.redis_cache import RedisCache  # noqa: E402
+from linguee_api.downloaders.sqlite_cache import SQLiteCache  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def redis_url():
+    """Start a local Redis server for the tests, or skip them."""
+    redis_server = shutil.which("redis-server")
+    if redis_server is None:
+        pytest.skip("redis-server is not installed")
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen(
+        [redis_server, "--port", str(port), "--save", "", "--appendonly", "no"],
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(50):
+            try:
+                socket.create_connection(("127.0.0.1", port)).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+        yield f"redis://127.0.0.1:{port}/0"
+    finally:
+        process.terminate()
+        process.wait()
+
+
+@pytest.fixture
+async def make_cache(redis_url):
+    """Return a RedisCache factory. All created caches are closed on teardown."""
+    caches = []
+
+    def make(message="foo", **kwargs):
+        cache = RedisCache(
+            redis_url=redis_url,
+            upstream=MockDownloader(message=message),
+            key_prefix=f"test:{time.monotonic()}:",
+            **kwargs,
+        )
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_should_cache_a_value(make_cache):
+    cache = make_cache(message="foo")
+    await cache.download("https://example.com")
+
+    cache.upstream = MockDownloader(message="bar")
+    assert await cache.download("https://example.com") == "foo"
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_should_set_ttl(make_cache):
+    cache = make_cache(ttl=3600)
+    await cache.download("https://example.com")
+    client = cache._get_client()
+    assert 0 < await client.ttl(cache._get_key("https://example.com")) <= 3600
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_should_keep_creation_time_of_stale_pages(
+    make_cache, tmp_path
+):
+    sqlite_cache = SQLiteCache(
+        cache_database=tmp_path / "cache.db",
+        upstream=MockDownloader(message="foo"),
+        soft_ttl=3600,
+    )
+    try:
+        await sqlite_cache.download("https://example.com")
+        _, writer = await sqlite_cache._get_connections()
+        await writer.execute(
+            "UPDATE cache SET created_at = datetime('now', '-2 hours')"
+        )
+        await writer.commit()
+
+        cache = make_cache(ttl=3 * 3600, soft_ttl=3600)
+        cache.upstream = sqlite_cache
+        await cache.download("https://example.com")
+        entry = await cache.get_cache_entry("https://example.com")
+        assert entry is not None
+        assert time.time() - entry.created_at > 7000
+        client = cache._get_client()
+        assert await client.ttl(cache._get_key("https://example.com")) <= 3600
+    finally:
+        await sqlite_cache.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_should_treat_unavailable_server_as_a_miss():
+    cache = RedisCache(
+        redis_url="redis://127.0.0.1:1/0", upstream=MockDownloader(message="foo")
+    )
+    try:
+        assert await cache.download("https://example.com") == "foo"
+    finally:
+        await cache.close()
@@ -0,0 +1,92 @@
+import asyncio
+
+import httpx
+import pytest
+
+from linguee_api.downloaders.httpx_downloader import HTTPXDownloader
+from linguee_api.downloaders.interfaces import (
+    DownloaderError,
+    IDownloader,
+    TransientDownloaderError,
+    UpstreamBlockedError,
+)
+from linguee_api.downloaders.retrying import RetryingDownloader
+
+
+def make_downloader(responses, **kwargs):
+    """Return a downloader over a fake upstream, replaying the responses."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    transport = httpx.MockTransport(handler)
+    downloader = RetryingDownloader(
+        upstream=HTTPXDownloader(transport=transport), backoff=0.001, **kwargs
+    )
+    return downloader, requests
+
+
+@pytest.mark.asyncio
+async def test_retrying_downloader_should_retry_transient_errors():
+    downloader, requests = make_downloader(
+        [
+            httpx.ConnectError("Connection refused"),
+            httpx.Response(502),
+            httpx.Response(200, text="foo"),
+        ]
+    )
+    assert await downloader.download("https://example.com") == "foo"
+    assert len(requests) == 3
+    await downloader.close()
+
+
+@pytest.mark.asyncio
+async def test_retrying_downloader_should_give_up_after_max_attempts():
+    downloader, requests = make_downloader(
+        [httpx.Response(500), httpx.Response(500)], max_attempts=2
+    )
+    with pytest.raises(TransientDownloaderError):
+        await downloader.download("https://example.com")
+    assert len(requests) == 2
+    await downloader.close()
+
+
+@pytest.mark.asyncio
+async def test_retrying_downloader_should_not_retry_503():
+    downloader, requests = make_downloader([httpx.Response(503)])
+    with pytest.raises(UpstreamBlockedError):
+        await downloader.download("https://example.com")
+    assert len(requests) == 1
+    await downloader.close()
+
+
+class SlowDownloader(IDownloader):
+    def __init__(self, delays):
+        self.delays = delays
+        self.calls = 0
+
+    async def download(self, url: str) -> str:
+        self.calls += 1
+        call = self.calls
+        await asyncio.sleep(self.delays[call - 1])
+        return f"page {call}"
+
+
+@pytest.mark.asyncio
+async def test_retrying_downloader_should_respect_deadline():
+    downloader = RetryingDownloader(upstream=SlowDownloader([1]), deadline=0.01)
+    with pytest.raises(DownloaderError, match="No response"):
+        await downloader.download("https://example.com")
+
+
+@pytest.mark.asyncio
+async def test_retrying_downloader_should_send_hedged_request():
+    upstream = SlowDownloader([1, 0])
+    downloader = RetryingDownloader(upstream=upstream, hedge=True, hedge_delay=0.01)
+    assert await downloader.download("https://example.com") == "page 2"
+    assert upstream.calls == 2
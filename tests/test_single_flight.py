@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from linguee_api.downloaders.interfaces import DownloaderError, IDownloader
+from linguee_api.downloaders.single_flight import SingleFlightDownloader
+
+
+class CountingDownloader(IDownloader):
+    def __init__(self, error: bool = False):
+        self.error = error
+        self.calls = 0
+
+    async def download(self, url: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.error:
+            raise DownloaderError(f"I cannot download {url}")
+        return f"page {self.calls}"
+
+
+@pytest.mark.asyncio
+async def test_single_flight_should_coalesce_concurrent_downloads():
+    upstream = CountingDownloader()
+    downloader = SingleFlightDownloader(upstream=upstream)
+    pages = await asyncio.gather(
+        *[downloader.download("https://example.com") for _ in range(10)]
+    )
+    assert pages == ["page 1"] * 10
+    assert upstream.calls == 1
+
+    # Nothing is cached once the request is finished
+    assert await downloader.download("https://example.com") == "page 2"
+
+
+@pytest.mark.asyncio
+async def test_single_flight_should_propagate_errors_to_all_waiters():
+    upstream = CountingDownloader(error=True)
+    downloader = SingleFlightDownloader(upstream=upstream)
+    results = await asyncio.gather(
+        *[downloader.download("https://example.com") for _ in range(3)],
+        return_exceptions=True,
+    )
+    assert all(isinstance(result, DownloaderError) for result in results)
+    assert upstream.calls == 1
+
+    # Errors are not cached
+    upstream.error = False
+    assert await downloader.download("https://example.com") == "page 2"
@@ -1,18 +1,37 @@
+import asyncio
+import time
 from pathlib import Path
 
 import pytest
 
+from linguee_api.downloaders.interfaces import ICache
 from linguee_api.downloaders.mock_downloader import MockDownloader
 from linguee_api.downloaders.sqlite_cache import SQLiteCache
 
 
+@pytest.fixture
+async def make_cache(tmp_path):
+    """Return a SQLiteCache factory. All created caches are closed on teardown."""
+    caches = []
+
+    def make(message="foo", **kwargs):
+        cache = SQLiteCache(
+            cache_database=Path(tmp_path) / "cache.db",
+            upstream=MockDownloader(message=message),
+            **kwargs,
+        )
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        await cache.close()
+
+
 @pytest.mark.asyncio
-async def test_sqlite_cache_should_cache_a_value(tmp_path):
+async def test_sqlite_cache_should_cache_a_value(make_cache):
     # Cache value
-    cache_database = Path(tmp_path) / "cache.db"
-    cache = SQLiteCache(
-        cache_database=cache_database, upstream=MockDownloader(message="foo")
-    )
+    cache = make_cache(message="foo")
     await cache.download("https://example.com")
 
     # Change upstream and try to get the value again
@@ -21,3 +40,169 @@ async def test_sqlite_cache_should_cache_a_value(tmp_path):
 
     # The value should be the same
     assert result2 == "foo"
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_should_reuse_connections_in_wal_mode(make_cache):
+    cache = make_cache()
+    await cache.open()
+    connections = await cache._get_connections()
+    await cache.download("https://example.com")
+    assert await cache._get_connections() == connections
+
+    reader, _ = connections
+    async with reader.execute("PRAGMA journal_mode") as cursor:
+        assert await cursor.fetchone() == ("wal",)
+
+    await cache.close()
+    assert cache._connections is None
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_should_write_behind_in_batches(make_cache):
+    cache = make_cache(write_behind=True, write_flush_interval=60)
+    for i in range(3):
+        await cache.download(f"https://example.com/{i}")
+
+    # Pages waiting in the queue are visible to readers
+    cache.upstream = MockDownloader(message="bar")
+    assert await cache.download("https://example.com/0") == "foo"
+
+    # The queue is drained on close
+    await cache.close()
+    assert cache._pending_writes == {}
+    cache = make_cache(message="bar")
+    assert await cache.download("https://example.com/2") == "foo"
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_should_replace_page_on_racing_writes(make_cache):
+    cache = make_cache()
+    await cache.put_to_cache("https://example.com", "foo")
+    await cache.put_to_cache("https://example.com", "bar")
+    assert await cache.get_from_cache("https://example.com") == "bar"
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_should_read_uncompressed_pages(make_cache):
+    cache = make_cache(message="bar")
+    _, writer = await cache._get_connections()
+    await writer.execute(
+        "INSERT INTO cache (url, page) VALUES (?, ?)", ["https://example.com", "foo"]
+    )
+    await writer.commit()
+    assert await cache.download("https://example.com") == "foo"
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_should_expire_old_pages(make_cache):
+    cache = make_cache(max_age=3600)
+    await cache.download("https://example.com")
+    _, writer = await cache._get_connections()
+    await writer.execute("UPDATE cache SET created_at = datetime('now', '-2 hours')")
+    await writer.commit()
+
+    # Expired page is not returned
+    cache.upstream = MockDownloader(message="bar")
+    assert await cache.get_from_cache("https://example.com") is None
+
+    # ... and removed on cleanup
+    await cache.cleanup()
+    async with writer.execute("SELECT count(*) FROM cache") as cursor:
+        assert await cursor.fetchone() == (0,)
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_should_evict_least_recently_used_pages(make_cache):
+    cache = make_cache(max_size=1)
+    await cache.put_to_cache("https://example.com/1", "foo")
+    await cache.put_to_cache("https://example.com/2", "bar")
+    _, writer = await cache._get_connections()
+    await writer.execute("UPDATE cache SET accessed_at = 0")
+    await writer.commit()
+
+    # Recently used pages are evicted last
+    await cache.get_from_cache("https://example.com/2")
+    cache.max_size = await cache._get_used_size(writer) - 1
+    await cache.cleanup()
+    assert await cache.get_from_cache("https://example.com/1") is None
+    assert await cache.get_from_cache("https://example.com/2") == "bar"
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_should_overwrite_pages_it_cannot_decode(make_cache):
+    cache = make_cache(message="bar")
+    _, writer = await cache._get_connections()
+    await writer.execute(
+        "INSERT INTO cache (url, page) VALUES (?, ?)",
+        ["https://example.com", b"\x00Sbroken"],
+    )
+    await writer.commit()
+    assert await cache.download("https://example.com") == "bar"
+    assert await cache.get_from_cache("https://example.com") == "bar"
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_should_write_all_pages_behind_with_short_interval(
+    make_cache,
+):
+    cache = make_cache(write_behind=True, write_batch_size=10, write_flush_interval=0)
+    for i in range(20):
+        await cache.put_to_cache(f"https://example.com/{i}", "foo")
+        await asyncio.sleep(0)
+    await cache.close()
+    assert cache._pending_writes == {}
+
+    cache = make_cache()
+    _, writer = await cache._get_connections()
+    async with writer.execute("SELECT count(*) FROM cache") as cursor:
+        assert await cursor.fetchone() == (20,)
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_should_refresh_stale_pages_in_background(make_cache):
+    cache = make_cache(message="foo", soft_ttl=3600)
+    await cache.download("https://example.com")
+    _, writer = await cache._get_connections()
+    await writer.execute("UPDATE cache SET created_at = datetime('now', '-2 hours')")
+    await writer.commit()
+
+    # Stale page is returned immediately, and refreshed once
+    cache.upstream = MockDownloader(message="bar")
+    assert await cache.download("https://example.com") == "foo"
+    assert await cache.download("https://example.com") == "foo"
+    assert len(cache._background_refreshes) == 1
+    await asyncio.gather(*cache._background_refreshes.values())
+    assert await cache.download("https://example.com") == "bar"
+
+
+class RecordingCache(ICache):
+    """Upper cache tier, recording the entries put to it."""
+
+    def __init__(self, upstream):
+        self.upstream = upstream
+        self.entries = {}
+
+    async def get_from_cache(self, url):
+        return None
+
+    async def put_to_cache(self, url, page):
+        raise AssertionError("put_cache_entry() is expected")
+
+    async def put_cache_entry(self, url, entry):
+        self.entries[url] = entry
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_should_pass_creation_time_to_upper_tier(make_cache):
+    cache = make_cache(message="foo", soft_ttl=3600)
+    await cache.download("https://example.com")
+    _, writer = await cache._get_connections()
+    await writer.execute("UPDATE cache SET created_at = datetime('now', '-2 hours')")
+    await writer.commit()
+
+    upper_cache = RecordingCache(upstream=cache)
+    assert await upper_cache.download("https://example.com") == "foo"
+    entry = upper_cache.entries["https://example.com"]
+    assert entry.page == "foo"
+    assert 7100 < time.time() - entry.created_at < 7300
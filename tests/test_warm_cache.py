@@ -0,0 +1,71 @@
+import io
+
+import pytest
+from xextract.parsers import ParsingError
+
+from linguee_api.linguee_client import NOT_FOUND_MESSAGE
+from linguee_api.models import ParseError
+from linguee_api.warm_cache import WarmUpQuery, read_queries, warm_cache
+
+
+class FakeClient:
+    def __init__(self, failing_queries=(), not_found_queries=(), broken_queries=()):
+        self.failing_queries = failing_queries
+        self.not_found_queries = not_found_queries
+        self.broken_queries = broken_queries
+        self.requests = []
+
+    async def process_search_result(self, *, query, src, dst, **kwargs):
+        self.requests.append(("search", query))
+        if query in self.failing_queries:
+            return ParseError(message="Linguee is blocking us")
+        if query in self.not_found_queries:
+            return ParseError(message=NOT_FOUND_MESSAGE)
+        if query in self.broken_queries:
+            raise ParsingError("Unexpected page")
+        return None
+
+    async def process_autocompletions(self, *, query, src_lang_code, dst_lang_code):
+        self.requests.append(("autocompletions", query))
+        return None
+
+
+def test_read_queries_should_skip_comments_and_validate_languages():
+    lines = ["# query\tsrc\tdst\n", "\n", "obrigado\tpt\ten\n"]
+    assert list(read_queries(lines)) == [WarmUpQuery("obrigado", "pt", "en")]
+
+    with pytest.raises(ValueError, match="Line 1: unknown language"):
+        list(read_queries(["obrigado\tpt\txx\n"]))
+
+
+@pytest.mark.asyncio
+async def test_warm_cache_should_record_processed_queries():
+    client = FakeClient(failing_queries={"asdfgh"})
+    queries = [WarmUpQuery("obrigado", "pt", "en"), WarmUpQuery("asdfgh", "pt", "en")]
+    state = io.StringIO()
+    stats = await warm_cache(client, queries, concurrency=2, state=state)
+
+    assert (stats.done, stats.failed) == (1, 1)
+    assert sorted(client.requests) == [
+        ("autocompletions", "obrigado"),
+        ("search", "asdfgh"),
+        ("search", "obrigado"),
+    ]
+    # Only successful queries are skipped on the next run
+    assert list(read_queries(state.getvalue().splitlines())) == [queries[0]]
+
+
+@pytest.mark.asyncio
+async def test_warm_cache_should_count_exceptions_as_failures():
+    client = FakeClient(not_found_queries={"asdfgh"}, broken_queries={"qwerty"})
+    queries = [
+        WarmUpQuery("qwerty", "pt", "en"),
+        WarmUpQuery("asdfgh", "pt", "en"),
+        WarmUpQuery("obrigado", "pt", "en"),
+    ]
+    state = io.StringIO()
+    stats = await warm_cache(client, queries, concurrency=1, state=state)
+
+    # The broken query doesn't stop the others. Not found queries are done.
+    assert (stats.done, stats.failed) == (2, 1)
+    assert list(read_queries(state.getvalue().splitlines())) == queries[1:]